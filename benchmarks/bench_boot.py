@@ -0,0 +1,137 @@
+"""
+Benchmark da subida a frio: tempo até o primeiro byte do /vagas num processo novo.
+
+Cada medição é um subprocesso que importa o main e faz o primeiro GET /vagas pelo
+test_client do Flask (sem gunicorn), como o serviço acordando no plano gratuito.
+Variantes:
+  - atual: imports preguiçosos + warm start
+  - antecipado: busca, IA e renderização importadas antes do main (o comportamento antigo)
+  - --ref <commit>: a árvore de outro commit (via git archive), para comparar com o histórico
+Cenários: com uma versão do painel já publicada em DATA_DIR, e com DATA_DIR vazio
+e só o snapshot (painel_vagas.html da última busca).
+
+Uso: python -m benchmarks.bench_boot [--runs 5] [--ref HEAD~1]
+"""
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EAGER_MODULES = ["src.search_engine", "src.html_generator", "src.ai_agent", "ddgs", "bs4", "apscheduler.schedulers.background"]
+
+CHILD = r"""
+import os, sys, time
+t0 = time.perf_counter()
+for name in sys.argv[1:]:
+    __import__(name)
+import main
+t1 = time.perf_counter()
+response = main.app.test_client().get("/vagas", headers={"Accept-Encoding": "gzip"}, buffered=False)
+first = next(iter(response.response), b"")
+t2 = time.perf_counter()
+print(f"BOOT {(t1 - t0) * 1000:.1f} {(t2 - t0) * 1000:.1f} {response.status_code} {len(first)}", flush=True)
+os._exit(0)
+"""
+
+
+def prepare_snapshot(directory):
+    """Painel com 500 vagas sintéticas, gerado pela árvore atual, para os cenários."""
+    sys.path.insert(0, ROOT)
+    from benchmarks.bench_dashboard import synthetic_jobs, synthetic_leads
+    from src.html_generator import render_dashboard, unique_jobs
+
+    path = os.path.join(directory, "painel_vagas.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(render_dashboard(unique_jobs(synthetic_jobs(500)), synthetic_leads()))
+    return path
+
+
+def publish_into(data_dir, snapshot):
+    """DATA_DIR com o snapshot já publicado (cenário "versão publicada")."""
+    env = dict(os.environ, DATA_DIR=data_dir, PYTHONPATH=ROOT)
+    code = ("import sys; from src import publisher; "
+            "f = open(sys.argv[1], encoding='utf-8'); publisher.publish(iter(lambda: f.read(65536), ''))")
+    subprocess.run([sys.executable, "-c", code, snapshot], env=env, cwd=ROOT, check=True)
+
+
+def boot_once(tree, run_dir, snapshot, preload):
+    env = dict(
+        os.environ,
+        PYTHONPATH=tree,
+        DATA_DIR=os.path.join(run_dir, "data"),
+        DASHBOARD_SNAPSHOT=snapshot,
+        # Sem agendador: só o warm start roda em segundo plano (e ainda pode imprimir)
+        SCHEDULER_ENABLED="0",
+        PYTHONDONTWRITEBYTECODE="1",
+    )
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD, *preload], env=env, cwd=run_dir, capture_output=True, text=True, timeout=120
+    )
+    wall = (time.perf_counter() - started) * 1000
+    # A linha BOOT pode sair colada a prints de outras threads
+    match = re.search(r"BOOT (\S+) (\S+) (\d+) (\d+)", result.stdout)
+    if match is None:
+        raise RuntimeError(f"subprocesso falhou:\n{result.stdout[-2000:]}\n{result.stderr[-2000:]}")
+    import_ms, first_byte_ms, status, _ = match.groups()
+    return float(import_ms), float(first_byte_ms), wall, int(status)
+
+
+def measure(label, tree, snapshot, published, preload, runs):
+    samples = []
+    for _ in range(runs):
+        run_dir = tempfile.mkdtemp(prefix="bench-boot-")
+        try:
+            if published:
+                publish_into(os.path.join(run_dir, "data"), snapshot)
+            samples.append(boot_once(tree, run_dir, snapshot, preload))
+        finally:
+            shutil.rmtree(run_dir, ignore_errors=True)
+    imports, first_bytes, walls, statuses = zip(*samples)
+    print(f"{label:<38} import {statistics.median(imports):7.1f} ms   1º byte {statistics.median(first_bytes):7.1f} ms   "
+          f"processo {statistics.median(walls):7.1f} ms   HTTP {statuses[0]}")
+    return statistics.median(walls)
+
+
+def export_ref(ref, directory):
+    archive = subprocess.run(["git", "archive", "--format=tar", ref], cwd=ROOT, capture_output=True, check=True).stdout
+    path = os.path.join(directory, "tree.tar")
+    with open(path, "wb") as f:
+        f.write(archive)
+    with tarfile.open(path) as tar:
+        tar.extractall(os.path.join(directory, "tree"))
+    return os.path.join(directory, "tree")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo até o primeiro byte do /vagas numa subida a frio")
+    parser.add_argument("--runs", type=int, default=5, help="subidas por variante (mediana)")
+    parser.add_argument("--ref", help="commit para comparar (ex.: HEAD~1)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-boot-") as tmp:
+        os.environ.setdefault("DATA_DIR", os.path.join(tmp, "parent-data"))
+        snapshot = prepare_snapshot(tmp)
+        print(f"Snapshot: {os.path.getsize(snapshot) / 1024:.0f} KB; mediana de {args.runs} subidas\n")
+        trees = [("atual", ROOT, [])]
+        trees.append(("antecipado", ROOT, EAGER_MODULES))
+        if args.ref:
+            trees.append((args.ref, export_ref(args.ref, tmp), []))
+
+        for published in (True, False):
+            print("Versão já publicada em DATA_DIR" if published else "DATA_DIR vazio, só o snapshot")
+            results = {label: measure(f"  {label}", tree, snapshot, published, preload, args.runs)
+                       for label, tree, preload in trees}
+            baseline = max(v for k, v in results.items() if k != "atual")
+            print(f"  atual: {baseline / results['atual']:.2f}x mais rápido que o pior caso\n")
+
+
+if __name__ == "__main__":
+    main()
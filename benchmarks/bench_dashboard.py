@@ -0,0 +1,86 @@
+"""
+Benchmark da geração do painel: concatenação numa string única x escrita em pedaços.
+
+Uso: python -m benchmarks.bench_dashboard [numero_de_vagas]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from src.html_generator import render_dashboard, unique_jobs
+
+
+def synthetic_jobs(count=10000):
+    boards = ["gupy.io", "br.indeed.com", "linkedin.com/jobs", "infojobs.com.br", "catho.com.br"]
+    jobs = []
+    for i in range(count):
+        board = boards[i % len(boards)]
+        job = {"url": f"https://www.{board}/vaga/analista-rh-manaus-{i}?ref=busca&origem=painel"}
+        if i % 4 == 0:
+            job["alternate_urls"] = [f"https://{boards[(i + 1) % len(boards)]}/vaga/{i}"]
+        jobs.append(job)
+    return jobs
+
+
+def synthetic_leads(count=30):
+    return [
+        {"url": f"https://noticias.exemplo.com/{i}", "title": f"Fábrica {i} anuncia expansão em Manaus",
+         "snippet": "Investimento deve gerar centenas de empregos no Polo Industrial. " * 4}
+        for i in range(count)
+    ]
+
+
+def legacy_build(jobs, leads, output_path):
+    """Estratégia antiga, como referência: `html +=` em cada pedaço e escrita no final."""
+    html = ""
+    for part in render_dashboard(unique_jobs(jobs), leads):
+        html += part
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(html)
+
+
+def streamed_build(jobs, leads, output_path):
+    """Mesma escrita do build_dashboard, sem o print de confirmação."""
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.writelines(render_dashboard(unique_jobs(jobs), leads))
+
+
+def measure(label, fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = min(times) * 1000
+    print(f"{label:<32} melhor {best:8.1f} ms   pico {peak / 1024 / 1024:7.2f} MB")
+    return best, peak
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    jobs, leads = synthetic_jobs(count), synthetic_leads()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.html")
+        stream_path = os.path.join(tmp, "stream.html")
+
+        legacy_build(jobs, leads, legacy_path)
+        streamed_build(jobs, leads, stream_path)
+        with open(legacy_path, encoding="utf-8") as a, open(stream_path, encoding="utf-8") as b:
+            same = a.read() == b.read()
+        print(f"{count} vagas, {os.path.getsize(stream_path) / 1024 / 1024:.1f} MB de HTML")
+        print(f"Paridade: {'OK' if same else 'DIVERGENTE'}\n")
+
+        legacy = measure("String única (html +=)", lambda: legacy_build(jobs, leads, legacy_path))
+        stream = measure("Em pedaços (writelines)", lambda: streamed_build(jobs, leads, stream_path))
+        print(f"\nGanho: {legacy[0] / stream[0]:.1f}x em tempo, {legacy[1] / max(stream[1], 1):.1f}x em memória")
+
+
+if __name__ == "__main__":
+    main()
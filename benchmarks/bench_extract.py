@@ -0,0 +1,70 @@
+"""
+Benchmark da extração de texto: BeautifulSoup completo x parser incremental.
+
+Uso: python -m benchmarks.bench_extract [tamanho_kb]
+"""
+import sys
+import time
+import tracemalloc
+
+from src.text_extractor import html_to_text, stream_html_to_text
+
+CHUNK = 16384
+
+
+def synthetic_page(size_kb=800):
+    """Página no estilo dos boards grandes: head pesado, estado JSON embutido e muito texto."""
+    state = '{"job": {"id": 1, "skills": [' + ",".join('"skill%d"' % i for i in range(size_kb * 8)) + ']}}'
+    paragraphs = "".join(
+        f"<div class='row'><p>Analista de Recursos Humanos Sênior {i} - Manaus/AM. "
+        f"Responsável por rotinas de DP, folha e indicadores.</p><span>item {i}</span></div>"
+        for i in range(size_kb * 6)
+    )
+    html = (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>Vaga RH Manaus</title>"
+        "<style>" + ".c{color:red}" * 2000 + "</style>"
+        f"<script>window.__STATE__ = {state};</script></head>"
+        f"<body><noscript>Ative o JavaScript</noscript><main>{paragraphs}</main></body></html>"
+    )
+    return html.encode("utf-8")
+
+
+def chunks_of(content):
+    for i in range(0, len(content), CHUNK):
+        yield content[i:i + CHUNK]
+
+
+def measure(label, fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = min(times) * 1000
+    print(f"{label:<32} melhor {best:8.1f} ms   pico {peak / 1024 / 1024:7.2f} MB")
+    return best, peak
+
+
+def main():
+    size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 800
+    content = synthetic_page(size_kb)
+    print(f"Página sintética: {len(content) / 1024:.0f} KB\n")
+
+    full_text = html_to_text(content)
+    stream_text, _ = stream_html_to_text(chunks_of(content), max_chars=0)
+    print(f"Paridade sem orçamento: {'OK' if full_text == stream_text else 'DIVERGENTE'}")
+    budget_text, stopped = stream_html_to_text(chunks_of(content), max_chars=4000)
+    print(f"Prefixo com orçamento 4000: {'OK' if full_text[:4000] == budget_text else 'DIVERGENTE'} (parou cedo: {stopped})\n")
+
+    full = measure("BeautifulSoup (completo)", lambda: html_to_text(content)[:4000])
+    measure("HTMLParser (sem orçamento)", lambda: stream_html_to_text(chunks_of(content), max_chars=0))
+    stream = measure("HTMLParser (4000 caracteres)", lambda: stream_html_to_text(chunks_of(content), max_chars=4000))
+    print(f"\nGanho: {full[0] / stream[0]:.1f}x em tempo, {full[1] / max(stream[1], 1):.1f}x em memória")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Micro-benchmark dos filtros de URL/texto: loops originais x motor compilado (src/filters.py).
+
+Uso: python -m benchmarks.bench_filters
+"""
+import random
+import time
+
+from src import filter_rules, filters
+
+random.seed(42)
+
+# Texto de vaga típico: a maioria das palavras não casa com nenhuma regra
+FILLER = (
+    "responsável pela gestão de pessoas folha de pagamento benefícios departamento pessoal "
+    "indicadores empresa polo industrial sede requisitos experiência comprovada rotinas trabalhistas "
+    "amazonas atuar com recrutamento seleção treinamento desenvolvimento clima organizacional"
+).split()
+KEYWORDS = (
+    "analista manaus vaga contratação processo seletivo camaçari são paulo recursos naturais "
+    "clase educación currículo rh"
+).split()
+
+
+def legacy_job_filter(url, text):
+    """Cópia fiel dos loops que existiam em get_job_opportunities (referência)."""
+    if any(b in url.lower() for b in filter_rules.JOB_BANNED_DOMAINS) or url.lower().endswith('.pdf'):
+        return False
+    if not text:
+        return False
+    lower_text = text.lower()
+    if any(city in lower_text for city in filter_rules.FORBIDDEN_CITIES):
+        if 'manaus' not in lower_text:
+            return False
+        if lower_text.count('camaçari') > lower_text.count('manaus'):
+            return False
+    if any(term in lower_text for term in filter_rules.OFFTOPIC_TERMS):
+        if not any(term in lower_text for term in filter_rules.JOB_SIGNAL_TERMS):
+            return False
+    if 'gov.br' in url.lower():
+        if not any(term in lower_text for term in filter_rules.GOV_JOB_TERMS):
+            return False
+    return True
+
+
+def corpus(n=400):
+    hosts = ["https://www.gupy.io/job/", "https://br.indeed.com/viewjob?jk=", "https://selecao.am.gov.br/",
+             "https://pt.wikipedia.org/wiki/", "https://www.catho.com.br/vagas/"]
+    samples = []
+    for i in range(n):
+        url = random.choice(hosts) + f"analista-rh-{i}"
+        size = random.choice([300, 1500, 4000])
+        words = [random.choice(KEYWORDS if random.random() < 0.03 else FILLER) for _ in range(size // 6)]
+        samples.append((url, " ".join(words)[:size]))
+    return samples
+
+
+def timed(label, fn, samples, rounds=20):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for url, text in samples:
+            fn(url, text)
+    per_call = (time.perf_counter() - start) / (rounds * len(samples)) * 1e6
+    print(f"{label:<40} {per_call:8.1f} µs/chamada")
+    return per_call
+
+
+def main():
+    samples = corpus()
+    automaton_engine = filters.JOB_TEXT_RULES.backend
+    print(f"Backend do motor: {automaton_engine}\n")
+
+    mismatches = sum(
+        legacy_job_filter(u, t) != (filters.job_drop_reason(u, t) is None) for u, t in samples
+    )
+    print(f"Paridade com os loops originais: {len(samples) - mismatches}/{len(samples)}\n")
+
+    print("URL + texto (por página baixada):")
+    timed("  loops originais", legacy_job_filter, samples)
+    timed(f"  motor compilado ({automaton_engine})", filters.job_drop_reason, samples)
+    print("Só URL (antes do download):")
+    timed("  loops originais", lambda u, t: any(b in u.lower() for b in filter_rules.JOB_BANNED_DOMAINS), samples)
+    timed(f"  motor compilado ({filters.JOB_URL_RULES.backend})", lambda u, t: filters.is_banned_job_url(u), samples)
+
+    # Escalabilidade: o custo da varredura termo a termo cresce com o nº de regras,
+    # o do autômato não (contagem completa de todos os termos)
+    print("\nContagem completa num texto de ~4 KB com N termos:")
+    text = samples[0][1] * 3
+    for n in (25, 250, 2500):
+        terms = [f"termo{i}x" for i in range(n)] + filter_rules.FORBIDDEN_CITIES
+        lazy = filters.RuleSet({"all": terms}, use_automaton=False)
+        compiled = filters.RuleSet({"all": terms}, use_automaton=True)
+        rows = []
+        for label, ruleset in (("str.count", lazy), (compiled.backend, compiled)):
+            start = time.perf_counter()
+            for _ in range(50):
+                result = ruleset.scan(text)
+                for term in terms:
+                    result[term]
+            rows.append(f"{label} {(time.perf_counter() - start) / 50 * 1e6:9.1f} µs")
+        print(f"  N={n:<5} " + "   ".join(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark do parsing no pool de processos (src/parse_pool.py) x no próprio processo.
+
+Várias threads parseiam páginas ao mesmo tempo, como as threads de download do
+PageFetcher; cada tamanho de página mostra onde o IPC passa a compensar
+(referência para o PARSE_POOL_MIN_BYTES). O ganho depende de haver mais de um núcleo.
+
+Uso: python -m benchmarks.bench_parse_pool [workers] [threads]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.bench_extract import synthetic_page
+from src import parse_pool
+
+SIZES_KB = {False: (32, 256, 1024), True: (32, 256)}   # BeautifulSoup em 1 MB leva segundos por página
+PAGES = 16
+URL = "https://br.indeed.com/viewjob?jk=benchmark"
+
+
+def run(content, threads, full):
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(
+            lambda _: parse_pool.parse(content, URL, 4000, full=full, classify=True), range(PAGES)
+        ))
+    return results
+
+
+def measure(label, content, threads, full, repeat=2):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = run(content, threads, full)
+        times.append(time.perf_counter() - start)
+    best = min(times) * 1000
+    print(f"{label:<34} melhor {best:8.1f} ms   {PAGES / min(times):7.1f} páginas/s   ({results[0][2]})")
+    return best, results[0][:2]
+
+
+def main():
+    workers = sys.argv[1] if len(sys.argv) > 1 else str(os.cpu_count() or 2)
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    print(f"{os.cpu_count()} núcleo(s), pool com {workers} processo(s), {threads} threads, {PAGES} páginas por rodada\n")
+
+    for full in (False, True):
+        print("BeautifulSoup (EXTRACT_MODE=full)" if full else "HTMLParser com orçamento (EXTRACT_MODE=stream)")
+        for size_kb in SIZES_KB[full]:
+            content = synthetic_page(size_kb)
+            os.environ["PARSE_WORKERS"] = "0"
+            local = measure(f"  {size_kb:>5} KB no processo", content, threads, full)
+            os.environ.update(PARSE_WORKERS=workers, PARSE_POOL_MIN_BYTES="0")
+            run(content, threads, full)  # sobe os processos fora da medição
+            pooled = measure(f"  {size_kb:>5} KB no pool", content, threads, full)
+            parity = "OK" if local[1] == pooled[1] else "DIVERGENTE"
+            print(f"  {'':>5}    ganho {local[0] / pooled[0]:.2f}x, paridade {parity}")
+        print()
+    parse_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
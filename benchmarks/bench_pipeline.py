@@ -0,0 +1,312 @@
+"""
+Benchmark offline do pipeline da busca, com as páginas gravadas em benchmarks/fixtures/.
+
+As funções reais (extract_job_text, filtros, get_job_opportunities, build_dashboard,
+evaluate_job/evaluate_jobs_batch) rodam sem rede: o DDGS e o cliente do Gemini viram
+stubs locais e a sessão HTTP compartilhada responde com os fixtures.
+Para cada etapa mostra vazão, latência (p50/p95/p99) e pico de memória; o resultado
+pode ser salvo como baseline e comparado nas próximas execuções.
+
+Uso:
+    python -m benchmarks.bench_pipeline                  # mede e compara com benchmarks/baseline.json
+    python -m benchmarks.bench_pipeline --save-baseline  # grava a baseline
+    python -m benchmarks.bench_pipeline --threshold 25 --rounds 10
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Antes de importar src/: nada de caches entre rodadas, limitadores sem espera e
+# dados num diretório temporário (o data/ de verdade não é tocado)
+_TMP = tempfile.TemporaryDirectory(prefix="bench-pipeline-")
+os.environ.update({
+    "DATA_DIR": _TMP.name,
+    "PAGE_CACHE_ENABLED": "0",
+    "SEARCH_CACHE_TTL": "0",
+    "VERDICT_STORE_ENABLED": "0",
+    "JOB_INDEX_REFRESH_HOURS": "0",
+    "SCHEDULER_ENABLED": "0",
+    "GEMINI_API_KEY": "benchmark",
+    "RATE_LIMIT_DDG": "100000,100000,100000",
+    "RATE_LIMIT_DOMAIN": "100000,100000,100000",
+    "RATE_LIMIT_GEMINI": "100000,100000,100000",
+})
+
+import requests
+from requests.adapters import BaseAdapter
+
+from src import ai_agent, filters, http_client, search_engine
+from src.fetcher import domain_of
+from src.html_generator import build_dashboard
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 20.0   # % de piora tolerada antes de acusar regressão
+
+
+def load_manifest():
+    with open(os.path.join(FIXTURES_DIR, "manifest.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_fixtures():
+    """{url original: bytes do HTML} a partir do manifest.json."""
+    pages = {}
+    for entry in load_manifest().values():
+        with open(os.path.join(FIXTURES_DIR, entry["file"]), "rb") as f:
+            pages[entry["url"]] = f.read()
+    return pages
+
+
+def check_drops(texts):
+    """
+    Os fixtures fora do perfil (campo "drop" do manifest) têm de cair no filtro pelo
+    motivo esperado; se passarem, o pipeline mede uma vaga a mais e a baseline engana.
+    """
+    wrong = []
+    for name, entry in load_manifest().items():
+        reason = filters.job_drop_reason(entry["url"], texts.get(entry["url"]))
+        if reason != entry.get("drop"):
+            wrong.append(f"{name}: esperado {entry.get('drop')}, filtro deu {reason}")
+    if wrong:
+        raise SystemExit("Fixtures com classificação inesperada:\n  " + "\n  ".join(wrong))
+
+
+def _variant(url, i):
+    """URL distinta que aponta para o mesmo fixture (parâmetro bench=N)."""
+    return f"{url}{'&' if '?' in url else '?'}bench={i}" if i else url
+
+
+def _base_url(url):
+    # Tira só o parâmetro bench=N das variantes; o resto da query identifica o fixture
+    parts = urlsplit(url)
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query) if k != "bench"])
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+
+class FixtureAdapter(BaseAdapter):
+    """Adapter do requests que responde com o fixture da URL (404 se não houver)."""
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = pages
+
+    def send(self, request, stream=False, **kwargs):
+        body = self.pages.get(_base_url(request.url))
+        response = requests.Response()
+        response.status_code = 200 if body is not None else 404
+        response.headers["Content-Type"] = "text/html; charset=utf-8"
+        response.raw = io.BytesIO(body or b"")
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+class StubDDGS:
+    """Substitui o DDGS: cada dork devolve as URLs dos fixtures do site pesquisado."""
+
+    urls = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def text(self, query, max_results=10, timelimit=None):
+        site = query.split()[0].removeprefix("site:").split("/")[0]
+        found = [u for u in self.urls if site in u] or self.urls[:1]
+        return [{"href": u} for u in found[:max_results]]
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubGemini:
+    """Cliente falso do Gemini: resposta pronta, no formato que o evaluate_* espera."""
+
+    def __init__(self):
+        self.models = self
+
+    def generate_content(self, model, contents, config=None):
+        count = str(contents).count("### VAGA")
+        if count:
+            return _Response(json.dumps([
+                {"id": i, "descartar": i % 3 == 0, "titulo": "Analista de RH", "empresa": "Empresa",
+                 "score": 8, "justificativa": "Perfil aderente"}
+                for i in range(1, count + 1)
+            ]))
+        return _Response("**Analista de RH na Empresa**\n🔗 Link: -\n⭐ Score: 8\n📝 Justificativa: Perfil aderente\n---")
+
+
+def install_stubs(pages, variants):
+    urls = [_variant(url, i) for url in pages for i in range(variants)]
+    StubDDGS.urls = urls
+    search_engine.DDGS = StubDDGS
+    stub = StubGemini()
+    ai_agent._get_client = lambda: stub
+    http_client.get_session().mount("https://", FixtureAdapter(pages))
+    # Módulos importados só no primeiro uso: carregados aqui para ficar fora da medição
+    import google.genai.types  # noqa: F401
+    return urls
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def run_stage(items, fn, rounds):
+    """Roda fn(item) para cada item, `rounds` vezes; depois uma passada extra com tracemalloc."""
+    latencies = []
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(rounds):
+            for item in items:
+                t0 = time.perf_counter()
+                fn(item)
+                latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+        tracemalloc.start()
+        for item in items:
+            fn(item)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    latencies.sort()
+    return {
+        "ops": len(latencies),
+        "ops_per_sec": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "peak_mb": round(peak / 1024 / 1024, 3),
+    }
+
+
+def synthetic_jobs(texts, count):
+    """Vagas para o painel/IA a partir dos textos extraídos dos fixtures."""
+    urls = list(texts)
+    return [
+        {"url": f"{urls[i % len(urls)]}?painel={i}", "text": texts[urls[i % len(urls)]]}
+        for i in range(count)
+    ]
+
+
+def run_all(rounds, variants, dashboard_jobs):
+    pages = load_fixtures()
+    urls = install_stubs(pages, variants)
+    output = os.path.join(_TMP.name, "painel_vagas.html")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        texts = {url: search_engine.extract_job_text(url) for url in pages}
+    check_drops(texts)
+    jobs = synthetic_jobs({u: t for u, t in texts.items() if t}, dashboard_jobs)
+    leads = [{"url": f"https://noticias.exemplo.com/{i}", "title": "Nova fábrica em Manaus...",
+              "snippet": "Investimento no Polo Industrial de Manaus deve gerar empregos..."} for i in range(30)]
+    batch = jobs[:ai_agent.DEFAULT_BATCH_SIZE * 4]
+
+    stages = {}
+    stages["extract"] = run_stage(urls, search_engine.extract_job_text, rounds)
+    stages["filter"] = run_stage(list(texts.items()), lambda item: filters.job_drop_reason(*item), rounds * 50)
+    stages["pipeline"] = run_stage([None], lambda _: search_engine.get_job_opportunities(), rounds)
+    stages["dashboard"] = run_stage(
+        [jobs], lambda items: build_dashboard(items, leads, output_path=output, lazy=False), rounds
+    )
+    stages["ai_prompt"] = run_stage(jobs[:50], lambda job: ai_agent.evaluate_job(job["url"], job["text"]), rounds)
+    stages["ai_batch"] = run_stage([batch], ai_agent.evaluate_jobs_batch, rounds)
+
+    accepted = search_engine.LAST_RUN_STATS.get("jobs", 0)
+    print(f"Fixtures: {len(pages)} páginas ({sum(map(len, pages.values())) / 1024:.0f} KB), "
+          f"{len(urls)} URLs com variantes; pipeline aceitou {accepted} vaga(s) por rodada "
+          f"({search_engine.LAST_RUN_STATS.get('unique_urls', 0)} URLs únicas)")
+    print(f"Domínios: {', '.join(sorted({domain_of(u) for u in pages}))}\n")
+    return stages
+
+
+def print_report(stages, baseline=None, threshold=DEFAULT_THRESHOLD):
+    """Tabela por etapa; com baseline, marca as métricas que pioraram além do limite."""
+    print(f"{'etapa':<10} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'pico MB':>9}")
+    regressions = []
+    for name, result in stages.items():
+        print(f"{name:<10} {result['ops_per_sec']:>10.1f} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+              f"{result['p99_ms']:>9.2f} {result['peak_mb']:>9.2f}")
+        old = (baseline or {}).get(name)
+        if not old:
+            continue
+        changes = []
+        for key, higher_is_worse in (("ops_per_sec", False), ("p95_ms", True), ("peak_mb", True)):
+            if not old.get(key):
+                continue
+            delta = (result[key] - old[key]) / old[key] * 100
+            worse = delta if higher_is_worse else -delta
+            changes.append(f"{key} {delta:+.1f}%")
+            if worse > threshold:
+                regressions.append(f"{name}.{key}: {old[key]} -> {result[key]} ({delta:+.1f}%)")
+        print(f"{'':<10} vs baseline: {', '.join(changes)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5, help="repetições de cada etapa")
+    parser.add_argument("--variants", type=int, default=4, help="URLs distintas por fixture no pipeline")
+    parser.add_argument("--dashboard-jobs", type=int, default=2000, help="vagas no painel gerado")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="%% de piora que conta como regressão")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="arquivo da baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="grava o resultado como nova baseline")
+    args = parser.parse_args()
+
+    stages = run_all(args.rounds, max(1, args.variants), args.dashboard_jobs)
+
+    if args.save_baseline:
+        print_report(stages)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "params": {"rounds": args.rounds, "variants": args.variants, "dashboard_jobs": args.dashboard_jobs},
+                "stages": stages,
+            }, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"\nBaseline gravada em {args.baseline}")
+        return 0
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("python") != platform.python_version() or baseline.get("machine") != platform.machine():
+            print(f"[Aviso] Baseline gravada com Python {baseline.get('python')} ({baseline.get('machine')}); "
+                  "compare na mesma máquina.\n")
+    regressions = print_report(stages, (baseline or {}).get("stages"), args.threshold)
+    if baseline is None:
+        print("\nSem baseline: rode com --save-baseline para gravar uma.")
+    elif regressions:
+        print(f"\nRegressões acima de {args.threshold:.0f}%:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+    else:
+        print(f"\nSem regressões acima de {args.threshold:.0f}% em relação à baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Benchmark de memória das vagas: dicts com texto x JobRecord (src/records.py).
+
+Preenche um índice temporário com N vagas aceitas de ~4000 caracteres e mede o
+pico (tracemalloc) e o que fica retido depois de montar a lista do painel:
+  - dicts: dashboard_jobs() inteiro na memória e o agrupamento antigo, que
+    copiava cada dict com o texto (referência; usa as assinaturas atuais)
+  - registros: get_indexed_jobs(), que lê o índice em lotes e solta o texto
+E o mesmo para as vagas de uma busca: lista de dicts x JobRecord com o texto
+na memória x JobRecord com JOB_TEXT_SPILL=1.
+
+Uso: python -m benchmarks.bench_records [vagas]
+"""
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+_TMP = tempfile.TemporaryDirectory(prefix="bench-records-")
+os.environ.update(DATA_DIR=_TMP.name, JOB_INDEX_MAX_AGE_DAYS="30", DEDUP_ENABLED="1")
+
+from src import dedup, job_index, records, search_engine  # noqa: E402
+
+WORDS = ("analista recursos humanos manaus departamento pessoal folha pagamento benefícios recrutamento "
+         "seleção treinamento desenvolvimento clima organizacional indústria polo industrial empresa vaga "
+         "experiência requisitos graduação administração psicologia gestão pessoas salário turno").split()
+DOMAINS = ("gupy.io", "br.indeed.com", "vagas.com.br", "linkedin.com", "solides.jobs", "catho.com.br")
+
+
+def synthetic_text(i):
+    rng = random.Random(i)
+    words = []
+    while sum(len(w) + 1 for w in words) < 4000:
+        words.append(rng.choice(WORDS))
+    return " ".join(words)[:4000]
+
+
+def populate(count):
+    for i in range(count):
+        url = f"https://{DOMAINS[i % len(DOMAINS)]}/vaga/{i}"
+        job_index.record(url, synthetic_text(i), job_index.ACCEPTED)
+
+
+def legacy_cluster(jobs):
+    """Cópia fiel do cluster_jobs com dicts (referência)."""
+    index = dedup.NearDuplicateIndex()
+    representatives = {}
+    result = []
+    for job in jobs:
+        sig = dedup.signature(job.get("text"))
+        match = index.query(sig) if sig else None
+        if match is not None and match in representatives:
+            if job["url"] != match:
+                representatives[match].setdefault("alternate_urls", []).append(job["url"])
+            continue
+        job = dict(job, alternate_urls=list(job.get("alternate_urls", [])))
+        if sig:
+            index.add(job["url"], sig)
+        representatives[job["url"]] = job
+        result.append(job)
+    return result
+
+
+def measure(label, build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<34} pico {peak / 1048576:7.1f} MB   retido {retained / 1048576:7.1f} MB   {elapsed:6.2f} s")
+    del result
+    return peak
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    populate(count)
+    print(f"{count} vagas aceitas no índice\n")
+
+    print("Lista do painel (índice inteiro)")
+    before = measure("dicts (antes)", lambda: legacy_cluster(job_index.dashboard_jobs()))
+    after = measure("registros (get_indexed_jobs)", search_engine.get_indexed_jobs)
+    print(f"  pico {before / after:.1f}x menor\n")
+
+    print("Vagas de uma busca (com o texto)")
+    urls = [f"https://{DOMAINS[i % len(DOMAINS)]}/vaga/{i}" for i in range(count)]
+    texts = [synthetic_text(i).encode("utf-8") for i in range(count)]
+    # Cada variante decodifica o próprio texto, como se viesse do parser
+    measure("dicts", lambda: [{"url": url, "text": raw.decode("utf-8")} for url, raw in zip(urls, texts)])
+    measure("JobRecord", lambda: [records.JobRecord(url, raw.decode("utf-8")) for url, raw in zip(urls, texts)])
+    spill = records.TextSpill()
+    measure("JobRecord + JOB_TEXT_SPILL", lambda: [records.JobRecord(url, raw.decode("utf-8"), spill=spill)
+                                                    for url, raw in zip(urls, texts)])
+
+
+if __name__ == "__main__":
+    main()
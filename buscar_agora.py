@@ -1,6 +1,7 @@
 import os
+import sys
 import webbrowser
-from src.search_engine import get_job_opportunities, get_business_leads
+from src.search_engine import get_job_opportunities, get_business_leads, get_indexed_jobs
 from src.html_generator import build_dashboard
 
 def main():
@@ -9,20 +10,24 @@ def main():
     print(" Isso pode levar cerca de 1 minuto. ")
     print("====================================")
     
-    # 1. Faz a busca de vagas
-    jobs = get_job_opportunities()
+    # 1. Faz a busca de vagas (--ia: vagas aceitas também passam pelo Gemini; padrão: AI_SCORING do .env)
+    jobs = get_job_opportunities(evaluate=True if "--ia" in sys.argv[1:] else None)
     
     # 2. Faz a busca de leads (notícias de expansão)
     print("\n[*] Buscando notícias de expansão empresarial...")
     leads = get_business_leads()
     
-    if not jobs and not leads:
+    # O painel usa o índice persistente: vagas de buscas anteriores continuam aparecendo
+    indexed_jobs = get_indexed_jobs()
+    
+    if not indexed_jobs and not leads:
         print("\n[!] Nada encontrado no momento (vagas ou notícias).")
         build_dashboard([], []) 
     else:
-        print(f"\n[*] Busca concluída! {len(jobs)} vagas e {len(leads)} notícias encontradas.")
+        print(f"\n[*] Busca concluída! {len(jobs)} vagas novas/confirmadas ({len(indexed_jobs)} no painel) e {len(leads)} notícias encontradas.")
         # 3. Gera o novo arquivo HTML no HD
-        build_dashboard(jobs, leads)
+        # Painel aberto como arquivo local: sem servidor para a API, então sempre completo
+        build_dashboard(indexed_jobs, leads, lazy=False)
     
     # 4. Abre o arquivo final diretamente no navegador
     html_path = 'file://' + os.path.realpath('painel_vagas.html')
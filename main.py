@@ -1,13 +1,16 @@
 import os
-import time
+import sys
 import threading
-from flask import Flask, send_file, make_response, jsonify
+import time
+import json
+from flask import Flask, Response, send_file, make_response, jsonify, request
 from dotenv import load_dotenv
 import pytz
 from datetime import datetime
 
-from src.search_engine import get_job_opportunities, get_business_leads
-from src.html_generator import build_dashboard
+# Busca (requests, ddgs, bs4), IA e renderização do painel são importadas só no
+# primeiro uso: numa subida a frio o /ping e o /vagas respondem sem esperar por elas
+from src import job_index, metrics, page_cache, progress, publisher, rate_limiter, runs, scheduler, search_cache, user_state, verdict_store
 
 load_dotenv()
 
@@ -16,9 +19,6 @@ app = Flask(__name__)
 # Configuração do Fuso Horário de Manaus (UTC-4)
 MANAUS_TZ = pytz.timezone('America/Manaus')
 
-# Flag global para indicar se a busca está rodando
-IS_SEARCHING = False
-
 @app.route('/')
 @app.route('/ping')
 def health_check():
@@ -26,55 +26,250 @@ def health_check():
 
 @app.route('/vagas')
 def painel_vagas():
-    # Verifica se o arquivo existe antes de enviar
-    if not os.path.exists('painel_vagas.html'):
+    manifest = publisher.current()
+    if manifest is None:
+        # A subida pode estar restaurando o snapshot do painel agora mesmo
+        _warm_started.wait(WARM_START_WAIT_SECONDS)
+        manifest = publisher.current()
+    if manifest is None:
         # Gera versão inicial vazia
+        from src.html_generator import build_dashboard
         build_dashboard([], [])
-        
-    response = make_response(send_file('painel_vagas.html'))
-    response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-    response.headers["Pragma"] = "no-cache"
-    response.headers["Expires"] = "0"
+        manifest = publisher.current()
+
+    # ETag forte = hash do conteúdo; recarregar sem mudanças responde 304 sem corpo
+    etag = manifest["etag"]
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
+    else:
+        # Variante já comprimida na publicação, conforme o Accept-Encoding do navegador
+        encoding = "identity"
+        for candidate in ("br", "gzip"):
+            if candidate in manifest["paths"] and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
+        response = make_response(send_file(manifest["paths"][encoding], mimetype="text/html", conditional=False, etag=False))
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag)
+    response.headers["Vary"] = "Accept-Encoding"
+    # no-cache = pode guardar, mas sempre revalida (If-None-Match) antes de usar
+    response.headers["Cache-Control"] = "no-cache"
     return response
 
+def _parse_time(value):
+    """Epoch em segundos ou data ISO (2024-05-01 / 2024-05-01T08:00) no fuso de Manaus."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = MANAUS_TZ.localize(parsed)
+    return parsed.timestamp()
+
+def _api_page(query, **extra_filters):
+    """Aplica os parâmetros comuns (cursor, limit, domain, since, until, fields) e responde em JSON."""
+    args = request.args
+    try:
+        fields = [f.strip() for f in args["fields"].split(",") if f.strip()] if args.get("fields") else None
+        page = query(
+            cursor=args.get("cursor"),
+            limit=int(args.get("limit", 50)),
+            domain=args.get("domain"),
+            since=_parse_time(args.get("since")),
+            until=_parse_time(args.get("until")),
+            fields=fields,
+            **extra_filters,
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(page)
+
+@app.route('/api/jobs')
+def api_jobs():
+    try:
+        min_score = float(request.args["min_score"]) if request.args.get("min_score") else None
+    except ValueError:
+        return jsonify({"error": "min_score deve ser numérico"}), 400
+    return _api_page(job_index.query_jobs, min_score=min_score,
+                     exclude_urls=user_state.urls(user_state.DISCARDED))
+
+@app.route('/api/leads')
+def api_leads():
+    return _api_page(job_index.query_leads)
+
+@app.route('/api/state', methods=['GET'])
+def api_state():
+    return jsonify(user_state.snapshot())
+
+@app.route('/api/state/<kind>', methods=['POST'])
+def api_set_state(kind):
+    """Corpo JSON: {"url": "..."} ou {"urls": [...]}, e "value": false para desmarcar."""
+    body = request.get_json(silent=True) or {}
+    urls = body.get("urls") or ([body["url"]] if body.get("url") else [])
+    if not urls:
+        return jsonify({"error": "informe url ou urls"}), 400
+    try:
+        user_state.set_state(kind, urls, bool(body.get("value", True)))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"ok": True, "count": len(urls)})
+
+@app.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
 @app.route('/status')
 def check_status():
-    global IS_SEARCHING
-    return jsonify({"is_searching": IS_SEARCHING})
+    # /status?run=<id>: situação e métricas de uma execução específica
+    run_id = request.args.get("run")
+    if run_id:
+        run = runs.get(run_id)
+        if run is None:
+            return jsonify({"error": f"execução {run_id} não encontrada"}), 404
+        return jsonify(run)
+
+    active = runs.active()
+    return jsonify({
+        "is_searching": active is not None,
+        "active_run": active,
+        "recent_runs": runs.recent(5),
+        "schedule": scheduler.jobs(),
+        "page_cache": page_cache.stats(),
+        "search_cache": search_cache.stats(),
+        "rate_limits": rate_limiter.stats(),
+        "verdict_store": verdict_store.stats(),
+        "job_index": job_index.stats(),
+        "user_state": user_state.stats(),
+        "progress": progress.snapshot(),
+        # Sem busca desde a subida o módulo nem foi carregado (import preguiçoso)
+        "last_run": getattr(sys.modules.get("src.search_engine"), "LAST_RUN_STATS", {}),
+    })
+
+# Conexões SSE são encerradas depois disso (o navegador reconecta sozinho)
+SSE_MAX_SECONDS = 600
+
+@app.route('/events')
+def progress_events():
+    """Progresso da busca por Server-Sent Events: eventos "progress", "job" e "done"."""
+    try:
+        last_id = int(request.headers.get("Last-Event-ID") or request.args.get("since") or 0)
+    except ValueError:
+        last_id = 0
+
+    def stream():
+        seq = last_id
+        yield "retry: 5000\n\n"
+        deadline = time.time() + SSE_MAX_SECONDS
+        while time.time() < deadline:
+            events = progress.events_since(seq, timeout=15)
+            if not events:
+                if not progress.running():
+                    # Nada rodando e nada novo: avisa o painel para fechar a conexão
+                    yield f"event: done\ndata: {json.dumps(progress.snapshot())}\n\n"
+                    return
+                yield ": keepalive\n\n"
+                continue
+            for seq, event, data in events:
+                yield f"id: {seq}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+            if events[-1][1] == "done":
+                return
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @app.route('/run')
 def manual_run():
-    global IS_SEARCHING
-    if IS_SEARCHING:
-        return "Já existe uma busca em andamento.", 400
-        
     now_str = datetime.now(MANAUS_TZ).strftime('%H:%M:%S')
-    print(f"\n[*] Disparo manual via URL às {now_str}")
-    search_thread = threading.Thread(target=run_job_search_task)
-    search_thread.start()
-    return "Busca de vagas iniciada com sucesso!", 200
-
-def run_job_search_task():
-    global IS_SEARCHING
-    IS_SEARCHING = True
+    try:
+        run_id, created = runs.submit(run_job_search_task, trigger="manual")
+    except runs.Busy:
+        return "Outra busca está sendo iniciada agora; tente de novo em instantes.", 503, {"Retry-After": "5"}
+    if not created:
+        return f"Já existe uma busca em andamento (execução {run_id}).", 400
+    progress.queued(run_id)
+
+    print(f"\n[*] Disparo manual via URL às {now_str} (execução {run_id})")
+    return jsonify({"message": "Busca de vagas iniciada com sucesso!", "run_id": run_id}), 202
+
+def run_job_search_task(run_id=None, part=None, parts=1):
+    """
+    Uma execução (vagas, leads, painel). Roda na fila de src/runs.py.
+    Com parts > 1 busca só a fatia `part` das dorks; os leads ficam com a fatia 0.
+    """
+    from src import search_engine
+    from src.html_generator import build_dashboard
+    from src.search_engine import iter_job_opportunities, iter_business_leads, get_indexed_jobs
+
+    progress.start_run(run_id=run_id, part=part, parts=parts)
+    metrics.start_run()
+    summary = {}
     try:
         now = datetime.now(MANAUS_TZ)
         print(f"\n--- Iniciando Busca Web às {now.strftime('%d/%m/%Y %H:%M')} (Manaus) ---")
         
         print("\n1. Buscando novas oportunidades...")
-        jobs = get_job_opportunities()
+        # Só a contagem: as vagas já ficam no índice, e é de lá que o painel sai
+        found = sum(1 for _ in iter_job_opportunities(part, parts))
         
-        print("\n2. Buscando notícias de expansão (Leads)...")
-        leads = get_business_leads()
+        found_leads = 0
+        if not part:
+            print("\n2. Buscando notícias de expansão (Leads)...")
+            progress.stage("leads")
+            found_leads = sum(1 for _ in iter_business_leads())
         
-        print(f"\n3. Atualizando o painel interativo na web com {len(jobs)} vagas e {len(leads)} leads...")
-        build_dashboard(jobs, leads)
+        # O painel mostra o índice inteiro (buscas recentes), não só o que esta execução achou
+        progress.stage("dashboard")
+        jobs = get_indexed_jobs()
+        leads = job_index.dashboard_leads()
+        print(f"\n3. Atualizando o painel interativo na web com {len(jobs)} vagas ({found} desta busca) e {len(leads)} leads...")
+        manifest = build_dashboard(jobs, leads)
+        summary = {"jobs": len(jobs), "found": found, "leads": found_leads, "version": manifest["etag"],
+                   "metrics": dict(search_engine.LAST_RUN_STATS)}
         print("\n[*] Painel atualizado.")
-            
+        return summary
+    except Exception as e:
+        summary = {"error": str(e)}
+        raise
+    finally:
+        metrics.inc("jobhunter_runs_total", result="failed" if "error" in summary else "finished")
+        # Resumo JSON por execução em DATA_DIR/runs/ (tempos por etapa, bytes, descartes)
+        summary["metrics_file"] = metrics.write_run_summary(
+            run_id or datetime.now(MANAUS_TZ).strftime('%Y%m%d-%H%M%S'), **summary
+        )
+        progress.finish(**summary)
+
+def submit_scheduled_run(part=None, parts=1):
+    run_id, created = runs.submit(lambda run_id: run_job_search_task(run_id, part, parts),
+                                  trigger="agendada" if parts == 1 else f"agendada {part + 1}/{parts}")
+    if created:
+        progress.queued(run_id)
+    return run_id, created
+
+# Até quanto tempo o primeiro /vagas espera a restauração do snapshot antes de gerar um painel vazio
+WARM_START_WAIT_SECONDS = 10
+_warm_started = threading.Event()
+
+def warm_start():
+    """
+    Roda numa thread logo após o import, sem atrasar o gunicorn: deixa o painel
+    pronto para o primeiro /vagas (versão atual ou DASHBOARD_SNAPSHOT) e liga o
+    agendador. WARM_START=0 desliga a restauração do snapshot.
+    """
+    try:
+        if os.getenv("WARM_START", "1") != "0":
+            publisher.warm_start(os.getenv("DASHBOARD_SNAPSHOT", "painel_vagas.html"))
     except Exception as e:
-        print(f"Erro crítico no run_job_search: {e}")
+        print(f"[Aviso] Falha ao preparar o painel na subida: {e}")
     finally:
-        IS_SEARCHING = False
+        _warm_started.set()
+    # Buscas periódicas dentro do próprio serviço (SCHEDULER_ENABLED=0 desliga)
+    scheduler.start(submit_scheduled_run)
+
+threading.Thread(target=warm_start, name="warm-start", daemon=True).start()
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 10000))
@@ -1,17 +1,20 @@
+import json
 import os
-import time
-from google import genai
-from google.genai import types
+import re
 
-def evaluate_job(job_url, job_text):
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        print("Erro: GEMINI_API_KEY não encontrada no .env")
-        return None
-        
-    client = genai.Client(api_key=api_key)
-    
-    prompt = f"""
+from src import metrics, rate_limiter, verdict_store
+
+def _retry_delay(error):
+    """Extrai o retryDelay (em segundos) que o Gemini manda junto do RESOURCE_EXHAUSTED."""
+    match = re.search(r"retryDelay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s", str(error))
+    return float(match.group(1)) if match else None
+
+GEMINI_MODEL = 'gemini-2.0-flash'
+DEFAULT_BATCH_SIZE = 8
+
+# Perfil e regras compartilhados pela avaliação individual e pela em lote
+# (no lote vão uma única vez como system_instruction, não a cada vaga)
+PROFILE_AND_RULES = """
     Você é um assistente de recrutamento executivo implacável. O seu objetivo é analisar uma vaga de emprego na área de Recursos Humanos e descartar severamente tudo que saia da regra do usuário.
     
     PERFIL DA CANDIDATA:
@@ -25,7 +28,72 @@ def evaluate_job(job_url, job_text):
     2. A vaga for no modelo "100% Remoto" ou "Home Office". O usuário DEIXOU CLARO que quer vagas presenciais em Manaus.
     3. A vaga for de nível muito iniciante (Júnior, Assistente ou Estágio).
     4. A vaga citar explicitlyamente que o processo foi encerrado, é do ano de 2025 ou mais velha.
-    
+"""
+
+_client = None
+_client_key = None
+
+def _get_client():
+    """Cliente do Gemini reaproveitado entre chamadas (recriado só se a chave mudar)."""
+    global _client, _client_key
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        print("Erro: GEMINI_API_KEY não encontrada no .env")
+        return None
+    if _client is None or _client_key != api_key:
+        # SDK do Gemini carregado só na primeira chamada (pesa na subida do serviço)
+        from google import genai
+        _client = genai.Client(api_key=api_key)
+        _client_key = api_key
+    return _client
+
+def _generate(contents, label, config=None):
+    """Chama o Gemini passando pelo rate limiter; retorna o texto da resposta ou None."""
+    client = _get_client()
+    if client is None:
+        return None
+
+    # O limitador compartilhado espaça as chamadas e, num 429, aplica backoff
+    # exponencial com jitter (ou o retryDelay sugerido pela própria API)
+    limiter = rate_limiter.get("gemini")
+    for attempt in range(3):
+        limiter.acquire()
+        try:
+            with metrics.timer("ai"):
+                response = client.models.generate_content(
+                    model=GEMINI_MODEL,
+                    contents=contents,
+                    config=config,
+                )
+            limiter.on_success()
+            return response.text
+        except Exception as e:
+            if rate_limiter.is_throttle_error(e):
+                delay = limiter.on_throttle(_retry_delay(e))
+                print(f"    [Aviso] Limite do Gemini atingido. Aguardando {delay:.0f}s... (Tentativa {attempt+1}/3)")
+            else:
+                print(f"Erro ao consultar o Gemini para {label}: {e}")
+                return None
+                
+    print(f"Falha ao consultar o Gemini após 3 tentativas para {label}")
+    return None
+
+# Consulta ao Gemini falhou (erro ou cota): a vaga ficou sem veredito, o que é
+# diferente de None (a IA descartou a vaga)
+FAILED = object()
+
+def evaluate_job(job_url, job_text):
+    """Texto formatado da vaga aprovada, ou None (descartada ou falha na consulta)."""
+    verdict = _evaluate_one(job_url, job_text)
+    return None if verdict is FAILED else verdict
+
+def _evaluate_one(job_url, job_text):
+    # Mesmo texto + mesma versão do prompt = mesmo veredito, sem gastar cota
+    found, verdict = verdict_store.lookup(job_text, prompt_version(), job_url)
+    if found:
+        return verdict
+
+    prompt = f"""{PROFILE_AND_RULES}
     URL DA VAGA: {job_url}
     
     TEXTO DA VAGA:
@@ -45,27 +113,138 @@ def evaluate_job(job_url, job_text):
     ---
     """
     
-    for attempt in range(3):
-        try:
-            response = client.models.generate_content(
-                model='gemini-2.0-flash',
-                contents=prompt,
-            )
-            # Se a IA decidiu descartar essa vaga, não retornamos nada
-            if "DESCARTAR" in response.text.upper():
-                return None
-            return response.text
-        except Exception as e:
-            msg_erro = str(e)
-            if "429" in msg_erro or "Quota" in msg_erro or "RESOURCE_EXHAUSTED" in msg_erro:
-                print(f"    [Aviso] Limite do Gemini atingido. Aguardando 30s... (Tentativa {attempt+1}/3)")
-                time.sleep(30)
-            else:
-                print(f"Erro ao consultar o Gemini para {job_url}: {e}")
-                return None
-                
-    print(f"Falha ao consultar o Gemini após 3 tentativas para {job_url}")
-    return None
+    text = _generate(prompt, job_url)
+    if text is None:
+        return FAILED
+    # Se a IA decidiu descartar essa vaga, não retornamos nada
+    verdict = None if "DESCARTAR" in text.upper() else text
+    verdict_store.store(job_text, prompt_version(), job_url, verdict)
+    return verdict
+
+BATCH_TASK = """
+    TAREFA:
+    Você receberá várias vagas numeradas. Avalie CADA uma separadamente contra o perfil e as REGRAS DE DESCARTE acima.
+    
+    RETORNO ESPERADO:
+    Retorne **apenas** um array JSON com um objeto por vaga, na mesma ordem, no formato:
+    [{"id": 1, "descartar": true|false, "titulo": "Título da Vaga", "empresa": "Nome da Empresa", "score": 0-10, "justificativa": "Breve explicação"}]
+    Para vagas descartadas, "titulo", "empresa", "score" e "justificativa" podem ficar vazios.
+"""
+
+def prompt_version():
+    """
+    Muda sozinha quando o perfil, as regras, o formato do lote ou o modelo são editados,
+    invalidando os vereditos guardados (ver src/verdict_store.py). Mudanças só no
+    formato do evaluate_job pedem PROMPT_VERSION manual no .env.
+    """
+    return verdict_store.prompt_version(PROFILE_AND_RULES, BATCH_TASK, GEMINI_MODEL)
+
+def _batch_prompt(jobs):
+    parts = [f"""
+    ### VAGA {i}
+    URL DA VAGA: {job['url']}
+    TEXTO DA VAGA:
+    {job['text']}
+""" for i, job in enumerate(jobs, start=1)]
+    return "".join(parts)
+
+def _parse_batch(text, expected):
+    """Converte a resposta do lote em {id: veredito}; ValueError se vier incompleta ou malformada."""
+    if not text:
+        raise ValueError("resposta vazia")
+    text = text.strip()
+    # Tolera a resposta embrulhada em bloco ```json ... ```
+    if text.startswith("```"):
+        text = text.strip("`")
+        text = text[text.index("["):] if "[" in text else text
+    data = json.loads(text)
+    if not isinstance(data, list):
+        raise ValueError("a resposta não é um array JSON")
+    verdicts = {}
+    for item in data:
+        if isinstance(item, dict) and isinstance(item.get("id"), int):
+            verdicts[item["id"]] = item
+    missing = set(range(1, expected + 1)) - set(verdicts)
+    if missing:
+        raise ValueError(f"vagas sem veredito: {sorted(missing)}")
+    return verdicts
+
+def _format_verdict(job_url, verdict):
+    """Mesmo formato de texto que o evaluate_job devolve (usado no Telegram)."""
+    if verdict.get("descartar"):
+        return None
+    return (
+        f"**{verdict.get('titulo') or 'Vaga'} na {verdict.get('empresa') or 'Empresa não informada'}**\n"
+        f"🔗 Link: {job_url}\n"
+        f"⭐ Score: {verdict.get('score', '?')}\n"
+        f"📝 Justificativa: {verdict.get('justificativa', '')}\n"
+        f"---"
+    )
+
+def verdict_score(verdict):
+    """Nota (0-10) da linha "Score:" de um veredito formatado, ou None."""
+    match = re.search(r"Score:\s*(\d+(?:[.,]\d+)?)", verdict or "")
+    return float(match.group(1).replace(",", ".")) if match else None
+
+def evaluate_jobs_batch(jobs, batch_size=None):
+    """
+    Avalia várias vagas ({"url", "text"}) com um pedido ao Gemini por lote.
+    Retorna uma lista alinhada com `jobs`: o texto formatado da vaga aprovada, None
+    se o Gemini a descartou ou FAILED se a consulta falhou (vaga sem veredito).
+    Se um lote vier malformado, ele é dividido ao meio e reenviado; um lote de uma
+    vaga só cai para o evaluate_job individual.
+    """
+    size = batch_size or int(os.getenv("GEMINI_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+    results = [FAILED] * len(jobs)
+
+    # Só vão para o Gemini as vagas cujo texto (ou o prompt) mudou desde a última avaliação
+    pending = []
+    for i, job in enumerate(jobs):
+        found, verdict = verdict_store.lookup(job["text"], prompt_version(), job["url"])
+        if found:
+            results[i] = verdict
+        else:
+            pending.append(i)
+    if len(pending) < len(jobs):
+        print(f"[*] {len(jobs) - len(pending)} vereditos reaproveitados, {len(pending)} vagas para o Gemini")
+
+    todo = [jobs[i] for i in pending]
+    evaluated = [FAILED] * len(todo)
+    for start in range(0, len(todo), size):
+        _evaluate_chunk(todo, start, min(start + size, len(todo)), evaluated)
+    for i, verdict in zip(pending, evaluated):
+        results[i] = verdict
+    return results
+
+def _evaluate_chunk(jobs, start, end, results):
+    chunk = jobs[start:end]
+    if len(chunk) == 1:
+        results[start] = _evaluate_one(chunk[0]["url"], chunk[0]["text"])
+        return
+
+    from google.genai import types
+
+    config = types.GenerateContentConfig(
+        system_instruction=PROFILE_AND_RULES + BATCH_TASK,
+        response_mime_type="application/json",
+    )
+    text = _generate(_batch_prompt(chunk), f"lote de {len(chunk)} vagas", config=config)
+    if text is None:
+        return
+
+    try:
+        verdicts = _parse_batch(text, len(chunk))
+    except ValueError as e:
+        middle = start + len(chunk) // 2
+        print(f"    [Aviso] Resposta do lote malformada ({e}). Dividindo em {middle - start} + {end - middle} vagas.")
+        _evaluate_chunk(jobs, start, middle, results)
+        _evaluate_chunk(jobs, middle, end, results)
+        return
+
+    for i, job in enumerate(chunk, start=1):
+        verdict = _format_verdict(job["url"], verdicts[i])
+        verdict_store.store(job["text"], prompt_version(), job["url"], verdict)
+        results[start + i - 1] = verdict
 
 if __name__ == "__main__":
     from dotenv import load_dotenv
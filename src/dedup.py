@@ -0,0 +1,124 @@
+import hashlib
+import os
+import re
+from array import array
+
+from src import records
+
+# Detecção de vagas quase idênticas (mesma vaga no gupy, indeed, linkedin...).
+# Cada texto vira uma assinatura MinHash de shingles de palavras; um índice LSH
+# por bandas devolve só os candidatos que colidem em algum balde, então a busca
+# não cresce com o tamanho do histórico. Os candidatos são confirmados pela
+# similaridade estimada (fração de posições iguais nas assinaturas).
+NUM_PERM = 64
+BANDS = 16                  # 16 bandas x 4 linhas: candidatos a partir de ~50% de similaridade
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.8
+
+_WORD = re.compile(r"\w+")
+_BIN_BITS = NUM_PERM.bit_length() - 1
+
+
+def _shingles(text):
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def signature(text):
+    """
+    Assinatura MinHash (array de NUM_PERM inteiros de 64 bits) ou None para texto vazio.
+    Usa "one permutation hashing": um único hash de 64 bits por shingle, cujos bits
+    baixos escolhem a posição e o resto entra na disputa pelo mínimo dela. Custa
+    um hash por shingle em vez de NUM_PERM; posições vazias (textos curtos) copiam
+    a próxima posição preenchida (densificação), mantendo a assinatura útil no LSH.
+    """
+    shingles = _shingles(text or "")
+    if not shingles:
+        return None
+    mins = [None] * NUM_PERM
+    mask = NUM_PERM - 1
+    for shingle in shingles:
+        # blake2b (e não hash()) para a assinatura ser estável entre processos
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+        slot, value = h & mask, h >> _BIN_BITS
+        current = mins[slot]
+        if current is None or value < current:
+            mins[slot] = value
+    for slot in range(NUM_PERM):
+        if mins[slot] is None:
+            step = 1
+            while mins[(slot + step) % NUM_PERM] is None:
+                step += 1
+            mins[slot] = mins[(slot + step) % NUM_PERM] + step
+    # array em vez de tupla: ~0,6 KB por vaga no índice em vez de ~3 KB de ints do Python
+    return array("Q", mins)
+
+
+def similarity(sig_a, sig_b):
+    """Estimativa da similaridade de Jaccard entre os dois textos."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_PERM
+
+
+class NearDuplicateIndex:
+    """Índice LSH de assinaturas MinHash: consulta proporcional aos candidatos, não ao total."""
+
+    def __init__(self, threshold=None):
+        self.threshold = threshold if threshold is not None else float(os.getenv("DEDUP_THRESHOLD", DEFAULT_THRESHOLD))
+        self._buckets = {}
+        self._signatures = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _bands(self, sig):
+        for band in range(BANDS):
+            # Uma chave bytes só (banda + linhas): sem tupla por balde
+            yield bytes((band,)) + sig[band * ROWS:(band + 1) * ROWS].tobytes()
+
+    def add(self, key, sig):
+        self._signatures[key] = sig
+        for band_key in self._bands(sig):
+            self._buckets.setdefault(band_key, []).append(key)
+
+    def query(self, sig):
+        """Chave do item indexado mais parecido acima do limiar, ou None."""
+        candidates = set()
+        for band_key in self._bands(sig):
+            candidates.update(self._buckets.get(band_key, ()))
+        best, best_score = None, self.threshold
+        for key in candidates:
+            score = similarity(sig, self._signatures[key])
+            if score >= best_score:
+                best, best_score = key, score
+        return best
+
+
+def cluster_jobs(jobs, index=None, keep_text=True):
+    """
+    Agrupa vagas quase idênticas mantendo a ordem original. Retorna só os
+    representantes (a primeira ocorrência) como JobRecord, cada um com
+    "alternate_urls" listando as outras URLs do grupo. `index` permite reaproveitar
+    um índice já carregado; keep_text=False solta o texto depois da assinatura
+    (o painel só usa a URL), e `jobs` pode ser um gerador.
+    """
+    index = index if index is not None else NearDuplicateIndex()
+    representatives = {}
+    result = []
+    for job in jobs:
+        job = records.job_record(job)
+        sig = signature(job.text)
+        match = index.query(sig) if sig else None
+        if match is not None and match in representatives:
+            if job.url != match:
+                representatives[match].alternate_urls.append(job.url)
+            continue
+        changes = {} if keep_text else {"text": ""}
+        job = job.replace(alternate_urls=list(job.alternate_urls or ()), **changes)
+        if sig:
+            index.add(job.url, sig)
+        representatives[job.url] = job
+        result.append(job)
+    return result
@@ -0,0 +1,88 @@
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlparse
+
+# Paralelismo padrão do download das páginas (configurável via .env)
+DEFAULT_FETCH_WORKERS = 8
+DEFAULT_FETCH_PER_DOMAIN = 2
+
+
+def domain_of(url):
+    """Retorna o domínio da URL sem o prefixo www."""
+    try:
+        return urlparse(url).netloc.lower().replace('www.', '')
+    except Exception:
+        return ""
+
+
+class PageFetcher:
+    """
+    Pool limitado de threads para baixar páginas em paralelo.
+    Cada domínio tem no máximo `per_domain` downloads simultâneos; o excedente
+    fica numa fila por domínio e só ocupa uma thread quando houver vaga,
+    assim um site lento não trava o pool inteiro.
+    """
+
+    def __init__(self, fetch_fn, max_workers=None, per_domain=None):
+        self.fetch_fn = fetch_fn
+        # Lido na criação (e não no import) para respeitar o load_dotenv do main.py
+        self.max_workers = max(1, max_workers or int(os.getenv("FETCH_WORKERS", DEFAULT_FETCH_WORKERS)))
+        self.per_domain = max(1, per_domain or int(os.getenv("FETCH_PER_DOMAIN", DEFAULT_FETCH_PER_DOMAIN)))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fetch")
+        self._lock = threading.Lock()
+        self._active = {}
+        self._pending = {}
+
+    def submit(self, url):
+        """Agenda o download da URL e retorna um Future com o resultado de fetch_fn."""
+        future = Future()
+        domain = domain_of(url)
+        with self._lock:
+            if self._active.get(domain, 0) < self.per_domain:
+                self._active[domain] = self._active.get(domain, 0) + 1
+                start = True
+            else:
+                self._pending.setdefault(domain, deque()).append((url, future))
+                start = False
+        if start:
+            self._start(domain, url, future)
+        return future
+
+    def map(self, urls):
+        """Baixa todas as URLs e devolve os resultados na mesma ordem da entrada."""
+        futures = [self.submit(url) for url in urls]
+        return [f.result() for f in futures]
+
+    def _start(self, domain, url, future):
+        inner = self._executor.submit(self.fetch_fn, url)
+        inner.add_done_callback(lambda done: self._finish(domain, future, done))
+
+    def _finish(self, domain, future, done):
+        # Libera o slot do domínio (ou passa direto para o próximo da fila) antes
+        # de entregar o resultado, para o consumidor nunca ver o pool "ocupado" à toa
+        with self._lock:
+            queue = self._pending.get(domain)
+            if queue:
+                next_url, next_future = queue.popleft()
+            else:
+                next_url = next_future = None
+                self._active[domain] -= 1
+        if next_future is not None:
+            self._start(domain, next_url, next_future)
+
+        error = done.exception()
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(done.result())
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
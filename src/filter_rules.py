@@ -0,0 +1,35 @@
+# Regras de filtragem compartilhadas pela busca de vagas e de leads.
+# Tudo em minúsculas: o motor em src/filters.py compara com o texto já em lowercase.
+
+# Domínios/trechos de URL proibidos nas vagas (filtro extra no Python)
+JOB_BANNED_DOMAINS = [
+    'ingles.com', 'dicionario', 'dictionary', 'translation', 'cambridge.org',
+    'significado', 'tradutor', 'spanishdict.com', 'glosbe.com',
+    'chevyavalanchefanclub.com', 'forum', 'clubedo', 'mecanica', 'autopecas',
+    'wikipedia.org', 'pt.wikipedia.org', 'en.wikipedia.org', '.pdf', 'millaray-temuco.cl',
+    'tiktok.com', 'facebook.com', 'instagram.com', 'twitter.com', 'x.com',
+    'mobills.com.br', 'meupaitrabalha', 'vagas.com.br/blog', 'gupy.io/blog', 'gupy.io/blog-do-emprego',
+    'blog.gupy.io', 'vagas.com.br/educacao', 'melhoresdestinos.com.br', 'tripadvisor', 'trivago',
+    'bahiaeconomica.com.br', 'alagoinhas', 'feiradesantana', 'mundoconectado.com.br', 'canaltech', 'tecmundo',
+    'rioempregos.com.br', 'vagasrj', 'vagasmg', 'vagaspe', 'vagasce', 'rh.com' # Bloqueando Restoration Hardware (falso positivo de RH)
+]
+
+# Domínios proibidos nos leads de notícias
+LEAD_BANNED_DOMAINS = [
+    'forum', 'clubedo', 'mecanica', 'chevyavalanchefanclub.com', 'wikipedia.org', 'millaray-temuco.cl',
+    'tiktok.com', 'facebook.com', 'instagram.com', 'mobills.com.br', 'gupy.io/blog', 'vagas.com.br/blog',
+    'melhoresdestinos.com.br', 'tripadvisor', 'bahiaeconomica.com.br', 'mundoconectado.com.br',
+    'rioempregos.com.br', 'rh.com'
+]
+
+# Validação de Cidade (Manaus deve ser a estrela, não Camaçari/Bahia)
+FORBIDDEN_CITIES = ['camaçari', 'alagoinhas', 'salvador', 'recife', 'fortaleza', 'rio de janeiro', 'são paulo', 'curitiba']
+
+# Recursos naturais ou guias escolares (falsos positivos de "RH")...
+OFFTOPIC_TERMS = ['naturales', 'recursos naturais', 'guia de estudo', 'clase', 'educación']
+# ...só são aceitos se o texto também tiver cara de vaga
+JOB_SIGNAL_TERMS = ['vaga', 'contrata', 'currículo', 'analista']
+
+# Sites governamentais: apenas se for vaga/concurso/seleção
+GOV_JOB_TERMS = ['vaga', 'concurso', 'processo seletivo', 'contratação', 'emprego', 'rh', 'recursos humanos']
+GOV_LEAD_TERMS = ['vaga', 'concurso', 'contratação', 'emprego', 'rh', 'recursos humanos', 'investimento', 'fábrica', 'empresa']
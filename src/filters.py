@@ -0,0 +1,162 @@
+from datetime import date
+
+from src import filter_rules
+
+# Com muitas regras, um autômato Aho-Corasick em C (pacote opcional pyahocorasick)
+# conta todos os termos numa única passada, com custo quase independente do nº de
+# termos. Com poucas regras (o caso atual, ~25 termos) a avaliação preguiçosa com
+# `in`/str.count do CPython é mais rápida: o texto é convertido uma vez só e os
+# grupos param no primeiro acerto. Ver benchmarks/bench_filters.py.
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+AUTOMATON_MIN_TERMS = 100
+
+
+class ScanResult:
+    """Ocorrências dos termos num texto, consultadas por termo ou por grupo de regras."""
+
+    __slots__ = ("text", "groups", "_counts")
+
+    def __init__(self, text, groups, counts=None):
+        self.text = text
+        self.groups = groups
+        # counts preenchido = varredura completa pelo autômato; None = preguiçosa
+        self._counts = counts
+
+    def __getitem__(self, term):
+        if self._counts is not None:
+            return self._counts.get(term, 0)
+        return self.text.count(term)
+
+    def has(self, term):
+        if self._counts is not None:
+            return term in self._counts
+        return term in self.text
+
+    def any(self, group):
+        """True se algum termo do grupo apareceu (para no primeiro acerto)."""
+        if self._counts is not None:
+            counts = self._counts
+            return any(term in counts for term in self.groups[group])
+        text = self.text
+        return any(term in text for term in self.groups[group])
+
+    def matched(self, group):
+        """Termos do grupo que apareceram (para log/métricas de descarte)."""
+        return [term for term in self.groups[group] if self.has(term)]
+
+
+class RuleSet:
+    """Grupos de termos compilados uma vez a partir de src/filter_rules.py."""
+
+    def __init__(self, groups, use_automaton=None):
+        self.groups = {name: tuple(dict.fromkeys(t.lower() for t in terms)) for name, terms in groups.items()}
+        self.terms = tuple(dict.fromkeys(t for terms in self.groups.values() for t in terms))
+        if use_automaton is None:
+            use_automaton = len(self.terms) >= AUTOMATON_MIN_TERMS
+        self._automaton = None
+        if use_automaton and ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for term in self.terms:
+                automaton.add_word(term, term)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    @property
+    def backend(self):
+        return "aho-corasick" if self._automaton is not None else "lazy"
+
+    def scan(self, text):
+        """Prepara a consulta dos termos no texto (case-insensitive)."""
+        lower_text = text.lower()
+        if self._automaton is None:
+            return ScanResult(lower_text, self.groups)
+        counts = {}
+        for _, term in self._automaton.iter(lower_text):
+            counts[term] = counts.get(term, 0) + 1
+        return ScanResult(lower_text, self.groups, counts)
+
+
+JOB_URL_RULES = RuleSet({"banned": filter_rules.JOB_BANNED_DOMAINS})
+LEAD_URL_RULES = RuleSet({"banned": filter_rules.LEAD_BANNED_DOMAINS})
+
+JOB_TEXT_RULES = RuleSet({
+    "forbidden_cities": filter_rules.FORBIDDEN_CITIES,
+    "manaus": ["manaus"],
+    "offtopic": filter_rules.OFFTOPIC_TERMS,
+    "job_signals": filter_rules.JOB_SIGNAL_TERMS,
+    "gov_terms": filter_rules.GOV_JOB_TERMS,
+})
+LEAD_TEXT_RULES = RuleSet({"gov_terms": filter_rules.GOV_LEAD_TERMS})
+
+
+def job_drop_reason(url, text, record=None):
+    """
+    Motivo pelo qual a vaga deve ser descartada, ou None se ela passa.
+    Mesma lógica dos filtros originais, agora com uma varredura por URL e uma por texto.
+    Com `record` (dados estruturados da página, ver search_engine.STRUCTURED_EXTRACTORS)
+    a cidade e a validade vêm dos campos exatos em vez da contagem de termos no texto.
+    """
+    if is_banned_job_url(url):
+        return "banned_domain"
+    if not text:
+        return "empty_text"
+    if record and _expired(record.get("valid_through")):
+        return "expired"
+
+    hits = JOB_TEXT_RULES.scan(text)
+    if record and record.get("cities"):
+        if not any("manaus" in city.lower() for city in record["cities"]):
+            return "forbidden_city"
+    elif hits.any("forbidden_cities"):
+        # Se tiver Manaus E uma cidade proibida, verificamos se Manaus parece ser apenas menção secundária
+        if not hits["manaus"]:
+            return "forbidden_city"
+        # Se Camaçari aparecer mais que Manaus, provavelmente é de lá
+        if hits["camaçari"] > hits["manaus"]:
+            return "forbidden_city"
+
+    # Descartar se falar de recursos naturais ou guias escolares
+    if hits.any("offtopic") and not hits.any("job_signals"):
+        return "offtopic"
+
+    # Validação especial para sites governamentais (apenas se for vaga/concurso/seleção)
+    if 'gov.br' in url.lower() and not hits.any("gov_terms"):
+        return "gov_br_rule"
+    return None
+
+
+def _expired(valid_through):
+    """validThrough (data ou data-hora ISO) já passou? Valores ilegíveis não descartam."""
+    if not valid_through:
+        return False
+    try:
+        deadline = date.fromisoformat(str(valid_through)[:10])
+    except ValueError:
+        return False
+    return deadline < date.today()
+
+
+def is_banned_job_url(url):
+    hits = JOB_URL_RULES.scan(url)
+    return hits.any("banned") or hits.text.endswith('.pdf')
+
+
+def is_banned_lead_url(url):
+    return LEAD_URL_RULES.scan(url).any("banned")
+
+
+def lead_drop_reason(url, text):
+    """Motivo de descarte de um lead de notícia, ou None se ele passa."""
+    if not text:
+        return "empty_text"
+    # Filtro para sites governamentais (apenas se for relevante para emprego/negócios)
+    if 'gov.br' in url.lower() and not LEAD_TEXT_RULES.scan(text).any("gov_terms"):
+        return "gov_br_rule"
+    # Filtro de conteúdo mínimo
+    if len(text) < 500:
+        return "too_short"
+    return None
@@ -1,11 +1,12 @@
 import os
+from urllib.parse import urlparse
 
-def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
-    unique_urls = list(set([j['url'] for j in jobs]))
-    total_jobs = len(unique_urls)
-    leads = leads or []
-    
-    html = f"""<!DOCTYPE html>
+from src import metrics, publisher
+
+# Partes fixas da página (CSS, cabeçalho e JS) montadas uma única vez na importação.
+# O painel é escrito em pedaços direto no arquivo: o custo cresce linearmente com
+# o número de cards, sem concatenar uma string gigante a cada vaga.
+_PAGE_HEAD = """<!DOCTYPE html>
 <html lang="pt-BR">
 <head>
     <meta charset="UTF-8">
@@ -14,7 +15,7 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
     <style>
         @import url('https://fonts.googleapis.com/css2?family=Outfit:wght@300;400;600;800&display=swap');
         
-        :root {{
+        :root {
             --bg-color: #0b0f19;
             --card-bg: rgba(17, 24, 39, 0.7);
             --border-color: rgba(255, 255, 255, 0.08);
@@ -26,15 +27,15 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
             --color-tracked: #f59e0b;
             --color-discard: #ef4444;
             --color-lead: #8b5cf6;
-        }}
+        }
 
-        * {{
+        * {
             box-sizing: border-box;
             margin: 0;
             padding: 0;
-        }}
+        }
 
-        body {{
+        body {
             font-family: 'Outfit', sans-serif;
             background-color: var(--bg-color);
             color: var(--text-main);
@@ -48,16 +49,16 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
                 radial-gradient(circle at 15% 50%, rgba(59, 130, 246, 0.08), transparent 25%),
                 radial-gradient(circle at 85% 30%, rgba(139, 92, 246, 0.08), transparent 25%);
             background-attachment: fixed;
-        }}
+        }
 
-        header {{
+        header {
             text-align: center;
             margin-bottom: 2rem;
             animation: fadeInDown 0.8s cubic-bezier(0.16, 1, 0.3, 1) forwards;
             opacity: 0;
-        }}
+        }
 
-        h1 {{
+        h1 {
             font-size: 3rem;
             font-weight: 800;
             margin-bottom: 0.5rem;
@@ -66,15 +67,15 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
             -webkit-text-fill-color: transparent;
             text-fill-color: transparent;
             letter-spacing: -0.02em;
-        }}
+        }
 
-        p.subtitle {{
+        p.subtitle {
             color: var(--text-secondary);
             font-size: 1.2rem;
             font-weight: 300;
-        }}
+        }
 
-        .container {{
+        .container {
             width: 100%;
             max-width: 850px;
             display: grid;
@@ -82,9 +83,9 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
             animation: fadeInUp 0.8s cubic-bezier(0.16, 1, 0.3, 1) forwards;
             animation-delay: 0.2s;
             opacity: 0;
-        }}
+        }
 
-        .section-title {{
+        .section-title {
             font-size: 1.4rem;
             font-weight: 700;
             margin: 2rem 0 1rem;
@@ -92,17 +93,17 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
             display: flex;
             align-items: center;
             gap: 0.75rem;
-        }}
+        }
 
-        .section-title::before {{
+        .section-title::before {
             content: '';
             width: 4px;
             height: 24px;
             background: var(--gradient);
             border-radius: 4px;
-        }}
+        }
 
-        .card {{
+        .card {
             background: var(--card-bg);
             backdrop-filter: blur(12px);
             -webkit-backdrop-filter: blur(12px);
@@ -115,9 +116,9 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
             display: flex;
             align-items: center;
             justify-content: space-between;
-        }}
+        }
 
-        .card::before {{
+        .card::before {
             content: '';
             position: absolute;
             top: 0;
@@ -127,54 +128,54 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
             background: var(--gradient);
             opacity: 0;
             transition: opacity 0.3s ease;
-        }}
+        }
 
-        .card:hover {{
+        .card:hover {
             transform: translateY(-4px);
             box-shadow: 0 20px 40px -15px rgba(0,0,0,0.5);
             border-color: rgba(255, 255, 255, 0.15);
             background: rgba(30, 41, 59, 0.8);
-        }}
+        }
 
-        .card:hover::before {{ opacity: 1; }}
+        .card:hover::before { opacity: 1; }
 
-        .card.lead-card {{
+        .card.lead-card {
             border-left: 4px solid var(--color-lead);
             display: block;
-        }}
-        .card.lead-card .lead-title {{
+        }
+        .card.lead-card .lead-title {
             font-weight: 700;
             color: var(--color-lead);
             margin-bottom: 0.5rem;
             font-size: 1.1rem;
-        }}
-        .card.lead-card .lead-snippet {{
+        }
+        .card.lead-card .lead-snippet {
             font-size: 0.9rem;
             color: var(--text-secondary);
-        }}
+        }
 
-        .card-content {{
+        .card-content {
             flex-grow: 1;
             padding-right: 1.5rem;
-        }}
+        }
 
-        .job-title-link {{
+        .job-title-link {
             text-decoration: none;
             color: var(--text-main);
             display: inline-block;
-        }}
+        }
 
-        .job-title {{
+        .job-title {
             font-weight: 600;
             font-size: 1.15rem;
             margin-bottom: 0.25rem;
             word-break: break-all;
             transition: color 0.3s ease;
-        }}
+        }
         
-        .card:hover .job-title {{ color: #fff; }}
+        .card:hover .job-title { color: #fff; }
 
-        .job-domain {{
+        .job-domain {
             color: var(--text-secondary);
             font-size: 0.9rem;
             font-weight: 400;
@@ -182,9 +183,9 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
             align-items: center;
             gap: 0.5rem;
             flex-wrap: wrap;
-        }}
+        }
 
-        .job-domain::before {{
+        .job-domain::before {
             content: '';
             display: inline-block;
             width: 6px;
@@ -192,15 +193,29 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
             border-radius: 50%;
             background: var(--accent);
             opacity: 0.7;
-        }}
+        }
 
-        .actions {{
+        .job-alternates {
+            font-size: 0.8rem;
+            color: var(--text-secondary);
+            margin-top: 0.25rem;
+        }
+
+        .alt-link {
+            color: var(--accent);
+            text-decoration: none;
+            margin-left: 0.35rem;
+        }
+
+        .alt-link:hover { text-decoration: underline; }
+
+        .actions {
             display: flex;
             gap: 0.6rem;
             flex-wrap: nowrap;
-        }}
+        }
 
-        .btn-action {{
+        .btn-action {
             background: rgba(255,255,255,0.03);
             border: 1px solid var(--border-color);
             padding: 0.6rem 1rem;
@@ -212,23 +227,23 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
             white-space: nowrap;
             cursor: pointer;
             text-decoration: none;
-        }}
+        }
         
-        .btn-visit {{ color: #fff; }}
-        .card:hover .btn-visit {{
+        .btn-visit { color: #fff; }
+        .card:hover .btn-visit {
             background: var(--gradient);
             border-color: transparent;
             box-shadow: 0 4px 15px rgba(59, 130, 246, 0.3);
-        }}
+        }
 
-        .btn-discard:hover {{ background: var(--color-discard); border-color: transparent; }}
-        .btn-track:hover {{ background: var(--color-tracked); border-color: transparent; }}
-        .btn-tracked-active {{ background: var(--color-tracked); border-color: transparent; }}
+        .btn-discard:hover { background: var(--color-discard); border-color: transparent; }
+        .btn-track:hover { background: var(--color-tracked); border-color: transparent; }
+        .btn-tracked-active { background: var(--color-tracked); border-color: transparent; }
 
-        .badge-new {{ background: var(--color-new); color: #fff; padding: 2px 6px; border-radius: 4px; font-size: 0.7rem; font-weight: 800; letter-spacing: 0.05em; }}
-        .badge-tracked {{ background: var(--color-tracked); color: #fff; padding: 2px 6px; border-radius: 4px; font-size: 0.7rem; font-weight: 800; letter-spacing: 0.05em; }}
+        .badge-new { background: var(--color-new); color: #fff; padding: 2px 6px; border-radius: 4px; font-size: 0.7rem; font-weight: 800; letter-spacing: 0.05em; }
+        .badge-tracked { background: var(--color-tracked); color: #fff; padding: 2px 6px; border-radius: 4px; font-size: 0.7rem; font-weight: 800; letter-spacing: 0.05em; }
 
-        .btn-update {{
+        .btn-update {
             background: rgba(255, 255, 255, 0.1);
             border: 1px solid var(--border-color);
             padding: 0.6rem 1.2rem;
@@ -242,14 +257,14 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
             align-items: center;
             gap: 0.5rem;
             margin-top: 1rem;
-        }}
-        .btn-update:hover {{
+        }
+        .btn-update:hover {
             background: var(--gradient);
             border-color: transparent;
-        }}
-        .btn-update:active {{ transform: scale(0.95); }}
+        }
+        .btn-update:active { transform: scale(0.95); }
         
-        #toast-notification {{
+        #toast-notification {
             position: fixed;
             bottom: 30px;
             right: 30px;
@@ -263,21 +278,21 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
             transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
             z-index: 999;
             font-weight: 600;
-        }}
-        #toast-notification.show {{
+        }
+        #toast-notification.show {
             transform: translateY(0);
             opacity: 1;
-        }}
+        }
 
-        @keyframes fadeInUp {{ from {{ opacity: 0; transform: translateY(30px); }} to {{ opacity: 1; transform: translateY(0); }} }}
-        @keyframes fadeInDown {{ from {{ opacity: 0; transform: translateY(-30px); }} to {{ opacity: 1; transform: translateY(0); }} }}
+        @keyframes fadeInUp { from { opacity: 0; transform: translateY(30px); } to { opacity: 1; transform: translateY(0); } }
+        @keyframes fadeInDown { from { opacity: 0; transform: translateY(-30px); } to { opacity: 1; transform: translateY(0); } }
         
-        .empty-state {{ text-align: center; color: var(--text-secondary); padding: 2rem; background: var(--card-bg); border-radius: 16px; border: 1px solid var(--border-color); }}
+        .empty-state { text-align: center; color: var(--text-secondary); padding: 2rem; background: var(--card-bg); border-radius: 16px; border: 1px solid var(--border-color); }
         
-        .stats {{ display: flex; gap: 1rem; justify-content: center; margin-bottom: 2rem; animation: fadeInDown 0.8s cubic-bezier(0.16, 1, 0.3, 1) forwards; opacity: 0; animation-delay: 0.1s; flex-wrap: wrap; }}
-        .stat-box {{ background: var(--card-bg); border: 1px solid var(--border-color); border-radius: 12px; padding: 0.75rem 1.5rem; text-align: center; min-width: 150px; }}
-        .stat-value {{ font-size: 1.8rem; font-weight: 800; background: var(--gradient); -webkit-background-clip: text; -webkit-text-fill-color: transparent; }}
-        .stat-label {{ font-size: 0.75rem; color: var(--text-secondary); text-transform: uppercase; letter-spacing: 0.05em; margin-top: 0.2rem; }}
+        .stats { display: flex; gap: 1rem; justify-content: center; margin-bottom: 2rem; animation: fadeInDown 0.8s cubic-bezier(0.16, 1, 0.3, 1) forwards; opacity: 0; animation-delay: 0.1s; flex-wrap: wrap; }
+        .stat-box { background: var(--card-bg); border: 1px solid var(--border-color); border-radius: 12px; padding: 0.75rem 1.5rem; text-align: center; min-width: 150px; }
+        .stat-value { font-size: 1.8rem; font-weight: 800; background: var(--gradient); -webkit-background-clip: text; -webkit-text-fill-color: transparent; }
+        .stat-label { font-size: 0.75rem; color: var(--text-secondary); text-transform: uppercase; letter-spacing: 0.05em; margin-top: 0.2rem; }
 
     </style>
 </head>
@@ -290,7 +305,9 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
     
     <div class="stats" id="dashboard-stats">
         <div class="stat-box">
-            <div class="stat-value" id="stat-total">{total_jobs}</div>
+            <div class="stat-value" id="stat-total">"""
+
+_PAGE_AFTER_TOTAL = """</div>
             <div class="stat-label">Vagas Listadas</div>
         </div>
         <div class="stat-box">
@@ -308,72 +325,35 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
         <div class="section-title">🚀 Oportunidades Estratégicas (Expansões e Notícias)</div>
         <div id="leads-container" style="display: grid; gap: 1rem; margin-bottom: 2rem;">
 """
-    
-    if not leads:
-        html += """
+
+_EMPTY_LEADS = """
             <div class="empty-state">
                 <p>Nenhuma notícia de expansão encontrada hoje.</p>
             </div>
 """
-    else:
-        for lead in leads:
-            html += f"""
-            <a href="{lead['url']}" target="_blank" class="card lead-card" style="text-decoration: none;">
-                <div class="lead-title">📢 {lead['title']}</div>
-                <div class="lead-snippet">{lead['snippet']}</div>
-                <div style="margin-top: 0.5rem; font-size: 0.8rem; color: var(--accent);">Ler notícia completa →</div>
-            </a>
-"""
 
-    html += """
+_JOBS_SECTION = """
         <div class="section-title">💼 Vagas Recentes Encontradas</div>
         <div id="cards-container" style="display: grid; gap: 1rem;">
 """
-    
-    try:
-        from urllib.parse import urlparse
-        
-        if not unique_urls:
-            html += """
+
+# Modo preguiçoso: container vazio, os cards chegam de /api/jobs em páginas
+_JOBS_SECTION_LAZY = """
+        <div class="section-title">💼 Vagas Recentes Encontradas</div>
+        <div id="cards-container" data-lazy="1" style="display: grid; gap: 1rem;">
+"""
+
+_EMPTY_JOBS = """
         <div class="empty-state">
             <p>Nenhuma vaga foi encontrada na última varredura.</p>
         </div>
 """
-        else:
-            for i, url in enumerate(unique_urls):
-                try:
-                    domain = urlparse(url).netloc
-                    domain = domain.replace('www.', '')
-                except:
-                    domain = "Site parceiro"
-                    
-                display_url = url
-                if len(display_url) > 75:
-                    display_url = display_url[:72] + '...'
-                    
-                html += f"""
-        <div class="card" data-url="{url}" id="card-{i}">
-            <div class="card-content">
-                <a href="{url}" target="_blank" class="job-title-link">
-                    <div class="job-title">{display_url}</div>
-                </a>
-                <div class="job-domain">{domain} <span class="badges-container"></span></div>
-            </div>
-            <div class="actions">
-                <button class="btn-action btn-track" onclick="toggleTrack(this)">⭐ Seguir</button>
-                <button class="btn-action btn-discard" onclick="discardJob(this)">🗑️ Ocultar</button>
-                <a href="{url}" target="_blank" class="btn-action btn-visit">Ir pra Vaga</a>
-            </div>
-        </div>
-"""
-    except Exception as e:
-        html += f"<p style='color:red;'>Erro ao compilar o painel: {e}</p>"
-    
-    html += """
+
+_PAGE_FOOTER = """
         </div>
     </div>
 
-    <div id="toast-notification">A caçada começou! Atualize a página em 1 minutinho. 🚀</div>
+    <div id="toast-notification">A caçada começou! As vagas novas vão aparecendo aqui. 🚀</div>
 
     <script>
     function checkStatusLoop() {
@@ -393,6 +373,52 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
         }, 3000);
     }
 
+    function formatProgress(p) {
+        if (p.stage === 'queued') return '⏳ Busca na fila...';
+        if (p.stage === 'leads') return '⏳ Buscando notícias de expansão...';
+        if (p.stage === 'dashboard') return '⏳ Atualizando o painel...';
+        let text = `⏳ Dork ${p.dork_index}/${p.dorks_total} · ${p.pages_done}/${p.pages_submitted} páginas · ${p.accepted} vagas · ${p.cache_hits} do cache`;
+        if (p.eta_seconds) text += ` · ~${Math.ceil(p.eta_seconds / 60)} min`;
+        return text;
+    }
+
+    function insertLiveCard(url) {
+        if (renderedUrls.has(url) || discardedSet.has(url)) return;
+        let container = document.getElementById('cards-container');
+        let empty = container.querySelector('.empty-state');
+        if (empty) empty.remove();
+        let domain = '';
+        try { domain = new URL(url).hostname.replace('www.', ''); } catch (e) {}
+        let card = buildJobCard({ url: url, domain: domain }, 'live-' + renderedUrls.size);
+        applyCardState(card);
+        container.prepend(card);
+        if (lazy.enabled) lazy.total++;
+        flushSeen();
+        updateStats();
+    }
+
+    // Progresso empurrado pelo servidor (SSE); sem suporte, volta para o polling do /status
+    function watchProgress() {
+        if (!window.EventSource) { checkStatusLoop(); return; }
+        let btn = document.querySelector('.btn-update');
+        let source = new EventSource('/events');
+        source.addEventListener('progress', e => {
+            btn.innerText = formatProgress(JSON.parse(e.data));
+        });
+        source.addEventListener('job', e => insertLiveCard(JSON.parse(e.data).url));
+        source.addEventListener('done', e => {
+            source.close();
+            let data = JSON.parse(e.data);
+            let toast = document.getElementById('toast-notification');
+            toast.innerText = data.error ? "A busca falhou: " + data.error : `Busca finalizada! ${data.found || 0} vagas nesta busca.`;
+            toast.classList.add('show');
+            setTimeout(() => { toast.classList.remove('show'); }, 4000);
+            btn.innerText = '🔄 Buscar Novas Vagas Agora!';
+            btn.style.opacity = '1';
+            btn.disabled = false;
+        });
+    }
+
     function forceUpdate() {
         let btn = document.querySelector('.btn-update');
         btn.innerText = '⏳ Robô trabalhando...';
@@ -409,7 +435,7 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
                 toast.classList.add('show');
                 setTimeout(() => { toast.classList.remove('show'); }, 4000);
                 
-                checkStatusLoop();
+                watchProgress();
             })
             .catch(err => {
                 console.error(err);
@@ -420,50 +446,178 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
             });
     }
 
-    document.addEventListener("DOMContentLoaded", function() {
-        let discarded = JSON.parse(localStorage.getItem('job_discarded') || '[]');
-        let tracked = JSON.parse(localStorage.getItem('job_tracked') || '[]');
-        let seen = JSON.parse(localStorage.getItem('job_seen') || '[]');
-        
-        let newCount = 0;
-        let trackedCount = 0;
-        let visibleCount = 0;
-        
-        document.querySelectorAll('#cards-container .card').forEach(card => {
-            let url = card.getAttribute('data-url');
-            
-            if (discarded.includes(url)) {
-                card.style.display = 'none';
-                return;
-            }
-            
-            visibleCount++;
-            let badges = card.querySelector('.badges-container');
-            
-            if (tracked.includes(url)) {
-                card.classList.add('tracked');
-                let trackBtn = card.querySelector('.btn-track');
-                trackBtn.innerText = '★ Remover';
-                trackBtn.classList.add('btn-tracked-active');
-                badges.innerHTML += '<span class="badge-tracked badge-node">SEGUINDO</span>';
-                trackedCount++;
-            }
-            
-            if (!seen.includes(url)) {
-                card.classList.add('new-job');
-                badges.innerHTML += '<span class="badge-new badge-node">NOVA HOJE</span>';
-                newCount++;
-                seen.push(url);
-            }
-        });
-        
-        document.getElementById('stat-total').innerText = visibleCount;
-        document.getElementById('stat-novas').innerText = newCount;
-        document.getElementById('stat-acompanhando').innerText = trackedCount;
-        
-        localStorage.setItem('job_seen', JSON.stringify(seen));
+    // Estado (seguidas/ocultadas/vistas) em Sets: consulta O(1) por card. Vem do
+    // servidor (/api/state); o localStorage só é usado sem servidor (arquivo local)
+    const STORAGE_KEYS = { tracked: 'job_tracked', discarded: 'job_discarded', seen: 'job_seen' };
+    const discardedSet = new Set(JSON.parse(localStorage.getItem('job_discarded') || '[]'));
+    const trackedSet = new Set(JSON.parse(localStorage.getItem('job_tracked') || '[]'));
+    const seenSet = new Set(JSON.parse(localStorage.getItem('job_seen') || '[]'));
+    const stateSets = { tracked: trackedSet, discarded: discardedSet, seen: seenSet };
+    const counts = { visible: 0, hidden: 0, novas: 0 };
+    const renderedUrls = new Set();
+    let serverState = false;
+    let newlySeen = [];
+
+    // Modo preguiçoso: os cards vêm de /api/jobs em páginas conforme a rolagem
+    const lazy = { enabled: false, cursor: null, hasMore: false, loading: false, total: 0, index: 0 };
+    const PAGE_SIZE = 50;
+
+    function postState(kind, urls, value) {
+        return fetch('/api/state/' + kind, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ urls: urls, value: value })
+        }).then(res => { if (!res.ok) throw new Error(res.statusText); });
+    }
+
+    function persistState(kind, urls, value) {
+        if (serverState) {
+            postState(kind, urls, value).catch(err => console.error("Erro ao salvar estado:", err));
+        } else {
+            localStorage.setItem(STORAGE_KEYS[kind], JSON.stringify(Array.from(stateSets[kind])));
+        }
+    }
+
+    function loadState() {
+        return fetch('/api/state')
+            .then(res => { if (!res.ok) throw new Error(res.statusText); return res.json(); })
+            .then(data => {
+                serverState = true;
+                Object.keys(stateSets).forEach(kind => {
+                    let local = Array.from(stateSets[kind]);
+                    // Primeira vez com o servidor: leva junto o que estava só neste navegador
+                    if (local.length && !data[kind].length) {
+                        postState(kind, local, true)
+                            .then(() => localStorage.removeItem(STORAGE_KEYS[kind]))
+                            .catch(err => console.error("Erro ao migrar estado:", err));
+                        return;
+                    }
+                    stateSets[kind].clear();
+                    data[kind].forEach(url => stateSets[kind].add(url));
+                });
+            })
+            .catch(() => { serverState = false; });
+    }
+
+    function flushSeen() {
+        if (newlySeen.length) {
+            persistState('seen', newlySeen, true);
+            newlySeen = [];
+        }
+    }
+
+    function applyCardState(card) {
+        let url = card.getAttribute('data-url');
+        renderedUrls.add(url);
+        if (discardedSet.has(url)) {
+            card.style.display = 'none';
+            counts.hidden++;
+            return;
+        }
+
+        counts.visible++;
+        let badges = card.querySelector('.badges-container');
+
+        if (trackedSet.has(url)) {
+            card.classList.add('tracked');
+            let trackBtn = card.querySelector('.btn-track');
+            trackBtn.innerText = '★ Remover';
+            trackBtn.classList.add('btn-tracked-active');
+            badges.innerHTML += '<span class="badge-tracked badge-node">SEGUINDO</span>';
+        }
+
+        if (!seenSet.has(url)) {
+            card.classList.add('new-job');
+            badges.innerHTML += '<span class="badge-new badge-node">NOVA HOJE</span>';
+            counts.novas++;
+            seenSet.add(url);
+            newlySeen.push(url);
+        }
+    }
+
+    function escapeHtml(value) {
+        return String(value).replace(/[&<>"']/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c]));
+    }
+
+    function buildJobCard(job, i) {
+        let url = escapeHtml(job.url);
+        let displayUrl = job.url.length > 75 ? job.url.slice(0, 72) + '...' : job.url;
+        let card = document.createElement('div');
+        card.className = 'card';
+        card.id = 'card-' + i;
+        card.setAttribute('data-url', job.url);
+        // Mesma vaga em outros sites (agrupada pelo dedup), como no painel completo
+        let alternates = (job.alternate_urls || []).map(alt => {
+            let host = alt;
+            try { host = new URL(alt).hostname.replace('www.', ''); } catch (e) {}
+            return ` <a href="${escapeHtml(alt)}" target="_blank" class="alt-link">${escapeHtml(host)}</a>`;
+        }).join('');
+        if (alternates) alternates = `<div class="job-alternates">Também em:${alternates}</div>`;
+        card.innerHTML = `
+            <div class="card-content">
+                <a href="${url}" target="_blank" class="job-title-link">
+                    <div class="job-title">${escapeHtml(displayUrl)}</div>
+                </a>
+                <div class="job-domain">${escapeHtml(job.domain || 'Site parceiro')} <span class="badges-container"></span></div>
+                ${alternates}
+            </div>
+            <div class="actions">
+                <button class="btn-action btn-track" onclick="toggleTrack(this)">⭐ Seguir</button>
+                <button class="btn-action btn-discard" onclick="discardJob(this)">🗑️ Ocultar</button>
+                <a href="${url}" target="_blank" class="btn-action btn-visit">Ir pra Vaga</a>
+            </div>`;
+        return card;
+    }
+
+    function loadMoreJobs() {
+        if (lazy.loading || (!lazy.hasMore && lazy.cursor !== null)) return;
+        lazy.loading = true;
+        let params = new URLSearchParams({ limit: PAGE_SIZE, fields: 'url,domain,alternate_urls' });
+        if (lazy.cursor) params.set('cursor', lazy.cursor);
+
+        fetch('/api/jobs?' + params.toString())
+            .then(res => res.json())
+            .then(data => {
+                let container = document.getElementById('cards-container');
+                let fragment = document.createDocumentFragment();
+                data.items.forEach(job => {
+                    if (renderedUrls.has(job.url)) return;
+                    let card = buildJobCard(job, lazy.index++);
+                    applyCardState(card);
+                    fragment.appendChild(card);
+                });
+                container.appendChild(fragment);
+                lazy.cursor = data.next_cursor || '';
+                lazy.hasMore = Boolean(data.next_cursor);
+                flushSeen();
+                updateStats();
+            })
+            .catch(err => console.error("Erro ao carregar vagas:", err))
+            .finally(() => { lazy.loading = false; });
+    }
+
+    function initCards() {
+        let container = document.getElementById('cards-container');
+        lazy.enabled = container.getAttribute('data-lazy') === '1';
+
+        if (lazy.enabled) {
+            lazy.total = parseInt(document.getElementById('stat-total').innerText, 10) || 0;
+            let sentinel = document.createElement('div');
+            sentinel.id = 'cards-sentinel';
+            container.after(sentinel);
+            new IntersectionObserver(entries => {
+                if (entries.some(e => e.isIntersecting)) loadMoreJobs();
+            }, { rootMargin: '600px' }).observe(sentinel);
+        } else {
+            container.querySelectorAll('.card').forEach(applyCardState);
+            flushSeen();
+            updateStats();
+        }
+    }
 
-        fetch('/status')
+    document.addEventListener("DOMContentLoaded", function() {
+        // Só acompanha a busca depois dos cards iniciais, para não duplicar os que chegarem ao vivo
+        loadState().then(initCards).then(() => fetch('/status'))
             .then(res => res.json())
             .then(data => {
                 if (data.is_searching) {
@@ -471,7 +625,7 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
                     btn.innerText = '⏳ Robô trabalhando (em background)...';
                     btn.style.opacity = '0.7';
                     btn.disabled = true;
-                    checkStatusLoop();
+                    watchProgress();
                 }
             })
             .catch(err => console.error("Erro ao checar status:", err));
@@ -480,15 +634,16 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
     function discardJob(btn) {
         let card = btn.closest('.card');
         let url = card.getAttribute('data-url');
-        let discarded = JSON.parse(localStorage.getItem('job_discarded') || '[]');
-        if (!discarded.includes(url)) {
-            discarded.push(url);
-            localStorage.setItem('job_discarded', JSON.stringify(discarded));
+        if (!discardedSet.has(url)) {
+            discardedSet.add(url);
+            persistState('discarded', [url], true);
         }
         card.style.opacity = '0';
         card.style.transform = 'translateX(50px)';
         setTimeout(() => {
             card.style.display = 'none';
+            counts.visible--;
+            counts.hidden++;
             updateStats();
         }, 300);
     }
@@ -496,44 +651,146 @@ def build_dashboard(jobs, leads=None, output_path="painel_vagas.html"):
     function toggleTrack(btn) {
         let card = btn.closest('.card');
         let url = card.getAttribute('data-url');
-        let tracked = JSON.parse(localStorage.getItem('job_tracked') || '[]');
         let badges = card.querySelector('.badges-container');
         
-        if (tracked.includes(url)) {
-            tracked = tracked.filter(u => u !== url);
-            localStorage.setItem('job_tracked', JSON.stringify(tracked));
-            
+        if (trackedSet.has(url)) {
+            trackedSet.delete(url);
             card.classList.remove('tracked');
             btn.innerText = '⭐ Seguir';
             btn.classList.remove('btn-tracked-active');
             let b = badges.querySelector('.badge-tracked');
             if (b) b.remove();
         } else {
-            tracked.push(url);
-            localStorage.setItem('job_tracked', JSON.stringify(tracked));
-            
+            trackedSet.add(url);
             card.classList.add('tracked');
             btn.innerText = '★ Remover';
             btn.classList.add('btn-tracked-active');
             badges.innerHTML += '<span class="badge-tracked badge-node">SEGUINDO</span>';
         }
+        persistState('tracked', [url], trackedSet.has(url));
         updateStats();
     }
     
     function updateStats() {
-        let tracked = JSON.parse(localStorage.getItem('job_tracked') || '[]');
-        let visibleCount = 0;
-        document.querySelectorAll('#cards-container .card').forEach(c => {
-            if (c.style.display !== 'none') visibleCount++;
-        });
-        document.getElementById('stat-total').innerText = visibleCount;
-        document.getElementById('stat-acompanhando').innerText = tracked.length;
+        // Com páginas ainda por carregar, o total vem do servidor menos o que já foi ocultado
+        let total = lazy.enabled && lazy.hasMore ? lazy.total - counts.hidden : counts.visible;
+        document.getElementById('stat-total').innerText = total;
+        document.getElementById('stat-novas').innerText = counts.novas;
+        document.getElementById('stat-acompanhando').innerText = trackedSet.size;
     }
     </script>
 </body>
 </html>
 """
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(html)
-    print(f"[*] Painel web gerado com sucesso: {output_path} ({total_jobs} vagas)")
+
+def _short_domain(url):
+    return urlparse(url).netloc.replace('www.', '')
+
+
+def render_lead_card(lead):
+    return f"""
+            <a href="{lead['url']}" target="_blank" class="card lead-card" style="text-decoration: none;">
+                <div class="lead-title">📢 {lead['title']}</div>
+                <div class="lead-snippet">{lead['snippet']}</div>
+                <div style="margin-top: 0.5rem; font-size: 0.8rem; color: var(--accent);">Ler notícia completa →</div>
+            </a>
+"""
+
+
+def render_job_card(i, job):
+    url = job['url']
+    try:
+        domain = _short_domain(url)
+    except ValueError:
+        domain = "Site parceiro"
+
+    display_url = url
+    if len(display_url) > 75:
+        display_url = display_url[:72] + '...'
+
+    # Mesma vaga encontrada em outros sites (agrupada pelo dedup)
+    alternates = "".join(
+        f' <a href="{alt_url}" target="_blank" class="alt-link">{_short_domain(alt_url) or alt_url}</a>'
+        for alt_url in job.get('alternate_urls', [])
+    )
+    if alternates:
+        alternates = f'<div class="job-alternates">Também em:{alternates}</div>'
+
+    return f"""
+        <div class="card" data-url="{url}" id="card-{i}">
+            <div class="card-content">
+                <a href="{url}" target="_blank" class="job-title-link">
+                    <div class="job-title">{display_url}</div>
+                </a>
+                <div class="job-domain">{domain} <span class="badges-container"></span></div>
+                {alternates}
+            </div>
+            <div class="actions">
+                <button class="btn-action btn-track" onclick="toggleTrack(this)">⭐ Seguir</button>
+                <button class="btn-action btn-discard" onclick="discardJob(this)">🗑️ Ocultar</button>
+                <a href="{url}" target="_blank" class="btn-action btn-visit">Ir pra Vaga</a>
+            </div>
+        </div>
+"""
+
+
+def unique_jobs(jobs):
+    """Remove URLs repetidas mantendo a ordem em que as vagas foram encontradas."""
+    result = []
+    seen_urls = set()
+    for job in jobs:
+        if job['url'] not in seen_urls:
+            seen_urls.add(job['url'])
+            result.append(job)
+    return result
+
+
+def render_dashboard(jobs, leads=None, lazy=False):
+    """
+    Gera o HTML do painel em pedaços (strings), na ordem em que devem ser escritos.
+    Com lazy=True só o total das vagas entra na página; os cards são buscados pelo
+    navegador em /api/jobs conforme a rolagem (exige o servidor do main.py).
+    """
+    leads = leads or []
+
+    yield _PAGE_HEAD
+    yield str(len(jobs))
+    yield _PAGE_AFTER_TOTAL
+
+    if not leads:
+        yield _EMPTY_LEADS
+    else:
+        for lead in leads:
+            yield render_lead_card(lead)
+
+    if lazy and jobs:
+        yield _JOBS_SECTION_LAZY
+        yield _PAGE_FOOTER
+        return
+
+    yield _JOBS_SECTION
+    try:
+        if not jobs:
+            yield _EMPTY_JOBS
+        else:
+            for i, job in enumerate(jobs):
+                yield render_job_card(i, job)
+    except Exception as e:
+        yield f"<p style='color:red;'>Erro ao compilar o painel: {e}</p>"
+
+    yield _PAGE_FOOTER
+
+
+def build_dashboard(jobs, leads=None, output_path="painel_vagas.html", lazy=None):
+    """
+    Gera o painel e publica como nova versão (troca atômica, ver src/publisher.py).
+    lazy=None segue o DASHBOARD_LAZY do .env.
+    """
+    jobs = unique_jobs(jobs)
+    if lazy is None:
+        lazy = os.getenv("DASHBOARD_LAZY", "0") == "1"
+    with metrics.timer("render"):
+        manifest = publisher.publish(render_dashboard(jobs, leads, lazy), output_path)
+    print(f"[*] Painel web gerado com sucesso: {output_path} ({len(jobs)} vagas, versão {manifest['etag'][:8]})")
+    return manifest
@@ -0,0 +1,105 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry, make_headers
+
+from src import rate_limiter
+from src.fetcher import domain_of
+
+# Valores padrão da camada HTTP (todos configuráveis via .env)
+DEFAULT_TIMEOUT = 10
+DEFAULT_POOL_HOSTS = 32     # quantos hosts diferentes mantêm conexões abertas
+DEFAULT_POOL_PER_HOST = 4   # conexões keep-alive reaproveitadas por host
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5
+DEFAULT_THROTTLE_RETRIES = 2  # novas tentativas após um 429
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _build_session():
+    retry = Retry(
+        total=int(os.getenv("HTTP_RETRIES", DEFAULT_RETRIES)),
+        backoff_factor=float(os.getenv("HTTP_BACKOFF", DEFAULT_BACKOFF)),
+        # 429 fica com o rate_limiter (backoff adaptativo por host)
+        status_forcelist=(500, 502, 503, 504),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=int(os.getenv("HTTP_POOL_HOSTS", DEFAULT_POOL_HOSTS)),
+        pool_maxsize=int(os.getenv("HTTP_POOL_PER_HOST", DEFAULT_POOL_PER_HOST)),
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Connection": "keep-alive",
+    })
+    # make_headers só anuncia "br" quando o pacote brotli está instalado
+    session.headers.update(make_headers(accept_encoding=True))
+    return session
+
+
+def get_session():
+    """Retorna a sessão HTTP compartilhada (criada sob demanda, uma por processo)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def request(method, url, limiter=None, **kwargs):
+    """
+    Requisição pela sessão compartilhada, passando pelo rate limiter do host
+    (ou pelo `limiter` informado). Um 429 reduz a taxa e a chamada é refeita
+    após o backoff; a última resposta é devolvida como veio.
+    """
+    kwargs.setdefault("timeout", float(os.getenv("HTTP_TIMEOUT", DEFAULT_TIMEOUT)))
+    limiter = rate_limiter.get(limiter) if limiter else rate_limiter.for_domain(domain_of(url))
+    attempts = 1 + int(os.getenv("HTTP_THROTTLE_RETRIES", DEFAULT_THROTTLE_RETRIES))
+    for attempt in range(attempts):
+        limiter.acquire()
+        response = get_session().request(method, url, **kwargs)
+        if response.status_code != 429:
+            limiter.on_success()
+            return response
+        delay = limiter.on_throttle(_retry_after(response))
+        if attempt + 1 < attempts:
+            # Devolve a conexão ao pool (com stream=True ela ficaria presa até o GC)
+            response.close()
+            print(f"[Aviso] 429 em {limiter.name}, nova tentativa em {delay:.1f}s ({attempt + 1}/{attempts})")
+    return response
+
+
+def _retry_after(response):
+    # Telegram manda o tempo no corpo JSON; a maioria dos sites usa o cabeçalho
+    value = response.headers.get("Retry-After")
+    if value is None:
+        try:
+            value = response.json().get("parameters", {}).get("retry_after")
+        except Exception:
+            value = None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def get(url, **kwargs):
+    """GET pela sessão compartilhada, com o timeout padrão do projeto."""
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    """POST pela sessão compartilhada (urllib3 só refaz falhas de conexão; 429 passa pelo limiter)."""
+    return request("POST", url, **kwargs)
@@ -0,0 +1,276 @@
+import base64
+import json
+import os
+import threading
+import time
+
+from src import storage
+from src.fetcher import domain_of
+
+# Índice persistente de todas as URLs de vagas já vistas. Cada execução só
+# baixa/filtra URLs novas ou "vencidas" (verificadas há mais de
+# JOB_INDEX_REFRESH_HOURS); as demais reaproveitam o resultado guardado.
+# O painel é montado a partir daqui, então vagas de buscas anteriores continuam
+# aparecendo enquanto forem vistas nos últimos JOB_INDEX_MAX_AGE_DAYS.
+DEFAULT_REFRESH_HOURS = 24
+DEFAULT_MAX_AGE_DAYS = 14
+MAX_PAGE_SIZE = 200
+
+# Campos que a API pode devolver (projeção via ?fields=)
+JOB_FIELDS = ("url", "domain", "first_seen", "last_seen", "changed_at", "score", "text", "alternate_urls")
+LEAD_FIELDS = ("url", "domain", "title", "snippet", "first_seen", "last_seen")
+# Campos calculados: as outras URLs do grupo de quase duplicatas (ver set_clusters)
+_COMPUTED_FIELDS = {
+    "alternate_urls": "(SELECT json_group_array(d.url) FROM jobs AS d WHERE d.duplicate_of = jobs.url)",
+}
+
+ACCEPTED = "accepted"
+DROPPED = "dropped"
+ERROR = "error"
+
+_conn = None
+_lock = threading.Lock()
+
+
+def _db():
+    global _conn
+    if _conn is None:
+        _conn = storage.connect(os.getenv("JOB_INDEX_FILE", "jobs.sqlite3"))
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                url TEXT PRIMARY KEY,
+                domain TEXT,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                fetched_at REAL,
+                changed_at REAL,
+                content_hash TEXT,
+                status TEXT NOT NULL,
+                drop_reason TEXT,
+                text TEXT
+            )
+        """)
+        # Bancos criados antes da coluna de nota
+        columns = {row["name"] for row in _conn.execute("PRAGMA table_info(jobs)")}
+        if "score" not in columns:
+            _conn.execute("ALTER TABLE jobs ADD COLUMN score REAL")
+        # URL do representante, para vagas agrupadas como quase duplicatas no último painel
+        if "duplicate_of" not in columns:
+            _conn.execute("ALTER TABLE jobs ADD COLUMN duplicate_of TEXT")
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_duplicate_of ON jobs(duplicate_of)")
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_seen ON jobs(status, last_seen)")
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_first ON jobs(status, first_seen)")
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS leads (
+                url TEXT PRIMARY KEY,
+                domain TEXT,
+                title TEXT,
+                snippet TEXT,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL
+            )
+        """)
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_leads_first ON leads(first_seen)")
+        _conn.commit()
+    return _conn
+
+
+def _max_age_cutoff(max_age_days=None):
+    """Epoch a partir do qual uma vaga (ou lead) ainda aparece no painel."""
+    days = max_age_days if max_age_days is not None else float(os.getenv("JOB_INDEX_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS))
+    return time.time() - days * 86400
+
+
+def _refresh_seconds():
+    return float(os.getenv("JOB_INDEX_REFRESH_HOURS", DEFAULT_REFRESH_HOURS)) * 3600
+
+
+def lookup_fresh(url):
+    """
+    Se a URL foi verificada dentro do prazo, marca como vista agora e devolve o
+    registro (dict); caso contrário None (precisa baixar de novo).
+    Falhas de download nunca ficam "frescas".
+    """
+    now = time.time()
+    with _lock:
+        row = _db().execute(
+            "SELECT url, status, drop_reason, text, fetched_at FROM jobs WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None or row["status"] == ERROR or not row["fetched_at"] or now - row["fetched_at"] >= _refresh_seconds():
+            return None
+        _db().execute("UPDATE jobs SET last_seen = ? WHERE url = ?", (now, url))
+        _db().commit()
+    return dict(row)
+
+
+def record(url, text, status, drop_reason=None, score=None):
+    """Grava o resultado do download + filtro de uma URL (score: nota opcional da vaga)."""
+    now = time.time()
+    digest = storage.content_hash(text) if text else None
+    with _lock:
+        conn = _db()
+        row = conn.execute("SELECT content_hash, changed_at FROM jobs WHERE url = ?", (url,)).fetchone()
+        changed_at = row["changed_at"] if row and row["content_hash"] == digest else now
+        conn.execute("""
+            INSERT INTO jobs (url, domain, first_seen, last_seen, fetched_at, changed_at, content_hash, status, drop_reason, text, score)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                last_seen = excluded.last_seen,
+                fetched_at = excluded.fetched_at,
+                changed_at = excluded.changed_at,
+                content_hash = excluded.content_hash,
+                status = excluded.status,
+                drop_reason = excluded.drop_reason,
+                text = excluded.text,
+                score = COALESCE(excluded.score, jobs.score)
+        """, (url, domain_of(url), now, now, now, changed_at, digest, status, drop_reason,
+              text[:4000] if status == ACCEPTED else None, score))
+        conn.commit()
+
+
+def dashboard_jobs(max_age_days=None):
+    """Vagas aceitas vistas nos últimos N dias, da mais recente para a mais antiga."""
+    return list(iter_dashboard_jobs(max_age_days))
+
+
+def iter_dashboard_jobs(max_age_days=None, batch_size=500):
+    """
+    Mesmas vagas do dashboard_jobs, lidas em lotes por keyset: a memória fica no
+    tamanho do lote, não do histórico, e a trava é solta entre um lote e outro.
+    """
+    cutoff = _max_age_cutoff(max_age_days)
+    where, params = "status = ? AND last_seen >= ?", [ACCEPTED, cutoff]
+    while True:
+        with _lock:
+            rows = _db().execute(
+                f"SELECT rowid AS _rowid, url, text, first_seen, last_seen FROM jobs WHERE {where} "
+                "ORDER BY first_seen DESC, rowid DESC LIMIT ?",
+                params + [batch_size],
+            ).fetchall()
+        for row in rows:
+            yield {"url": row["url"], "text": row["text"], "first_seen": row["first_seen"], "last_seen": row["last_seen"]}
+        if len(rows) < batch_size:
+            return
+        last = rows[-1]
+        where = "status = ? AND last_seen >= ? AND (first_seen < ? OR (first_seen = ? AND rowid < ?))"
+        params = [ACCEPTED, cutoff, last["first_seen"], last["first_seen"], last["_rowid"]]
+
+
+def set_clusters(jobs):
+    """
+    Guarda o agrupamento de quase duplicatas do painel (representantes com
+    "alternate_urls"), para a /api/jobs devolver os mesmos cards do painel completo.
+    """
+    with _lock:
+        conn = _db()
+        conn.execute("UPDATE jobs SET duplicate_of = NULL WHERE duplicate_of IS NOT NULL")
+        conn.executemany(
+            "UPDATE jobs SET duplicate_of = ? WHERE url = ?",
+            ((job["url"], alt_url) for job in jobs for alt_url in job.get("alternate_urls", [])),
+        )
+        conn.commit()
+
+
+def record_lead(url, title, snippet):
+    """Grava (ou marca como vista de novo) uma notícia aceita pelos filtros de leads."""
+    now = time.time()
+    with _lock:
+        _db().execute("""
+            INSERT INTO leads (url, domain, title, snippet, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET title = excluded.title, snippet = excluded.snippet, last_seen = excluded.last_seen
+        """, (url, domain_of(url), title, snippet, now, now))
+        _db().commit()
+
+
+def encode_cursor(first_seen, rowid):
+    return base64.urlsafe_b64encode(f"{first_seen!r}:{rowid}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """(first_seen, rowid) do cursor opaco; ValueError se estiver malformado."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        first_seen, rowid = raw.split(":")
+        return float(first_seen), int(rowid)
+    except (UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"cursor inválido: {cursor!r}") from e
+
+
+def _page(table, fields, allowed, where, params, cursor, limit):
+    """
+    Página por keyset (first_seen DESC, rowid DESC): o custo de cada página não
+    depende de quantas vieram antes, ao contrário de OFFSET.
+    """
+    fields = [f for f in (fields or allowed) if f in allowed] or list(allowed)
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    if cursor:
+        first_seen, rowid = decode_cursor(cursor)
+        where = where + ["(first_seen < ? OR (first_seen = ? AND rowid < ?))"]
+        params = params + [first_seen, first_seen, rowid]
+    columns = [f"{_COMPUTED_FIELDS[f]} AS {f}" if f in _COMPUTED_FIELDS else f for f in fields]
+    sql = (f"SELECT rowid AS _rowid, {', '.join(columns + ['first_seen AS _first_seen'])} FROM {table}"
+           f"{' WHERE ' + ' AND '.join(where) if where else ''} ORDER BY first_seen DESC, rowid DESC LIMIT ?")
+    with _lock:
+        rows = _db().execute(sql, params + [limit + 1]).fetchall()
+    items = [{f: json.loads(row[f]) if f in _COMPUTED_FIELDS else row[f] for f in fields} for row in rows[:limit]]
+    next_cursor = encode_cursor(rows[limit - 1]["_first_seen"], rows[limit - 1]["_rowid"]) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def _period_filters(domain, since, until):
+    where, params = [], []
+    if domain:
+        where.append("domain = ?")
+        params.append(domain.lower().replace("www.", ""))
+    if since is not None:
+        where.append("first_seen >= ?")
+        params.append(since)
+    if until is not None:
+        where.append("first_seen < ?")
+        params.append(until)
+    return where, params
+
+
+def query_jobs(cursor=None, limit=50, domain=None, since=None, until=None, min_score=None, fields=None,
+               exclude_urls=None, max_age_days=None):
+    """
+    Vagas aceitas, das mais novas para as mais antigas, filtradas por domínio,
+    período de first_seen (epoch) e nota mínima, sem as URLs de `exclude_urls`
+    (ex.: ocultadas pelo usuário). Retorna {"items", "next_cursor"}.
+    Mesmos cards do painel: só vagas vistas nos últimos JOB_INDEX_MAX_AGE_DAYS e
+    um representante por grupo de quase duplicatas (as outras em "alternate_urls").
+    """
+    where, params = _period_filters(domain, since, until)
+    where[:0] = ["status = ?", "last_seen >= ?", "duplicate_of IS NULL"]
+    params[:0] = [ACCEPTED, _max_age_cutoff(max_age_days)]
+    if min_score is not None:
+        where.append("score >= ?")
+        params.append(min_score)
+    if exclude_urls:
+        # Uma lista JSON como parâmetro único: sem limite de variáveis do SQLite
+        where.append("url NOT IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(list(exclude_urls)))
+    return _page("jobs", fields, JOB_FIELDS, where, params, cursor, limit)
+
+
+def query_leads(cursor=None, limit=50, domain=None, since=None, until=None, fields=None):
+    """Leads de notícias, das mais novas para as mais antigas (mesmos filtros das vagas)."""
+    where, params = _period_filters(domain, since, until)
+    return _page("leads", fields, LEAD_FIELDS, where, params, cursor, limit)
+
+
+def dashboard_leads(max_age_days=None):
+    """Leads vistos nos últimos N dias (mesmo prazo das vagas), do mais novo ao mais antigo."""
+    with _lock:
+        rows = _db().execute(
+            "SELECT url, title, snippet FROM leads WHERE last_seen >= ? ORDER BY first_seen DESC, rowid DESC",
+            (_max_age_cutoff(max_age_days),),
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def stats():
+    with _lock:
+        rows = _db().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+    return {row[0]: row[1] for row in rows}
+
@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from src import runs, storage
+
+# Instrumentação da busca: contadores e histogramas com rótulos, no formato
+# texto do Prometheus (/metrics) e num resumo JSON por execução (data/runs/).
+# Sem dependência do prometheus_client: são poucos tipos e um processo só.
+#
+# Etapas medidas (jobhunter_stage_seconds{stage=...}): search, fetch, parse,
+# filter, ai, render. Latência por site em jobhunter_fetch_seconds{domain=...}.
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {
+    "jobhunter_stage_seconds": ("histogram", "Tempo gasto por etapa da busca"),
+    "jobhunter_fetch_seconds": ("histogram", "Latência de download por domínio"),
+    "jobhunter_bytes_downloaded_total": ("counter", "Bytes baixados das páginas de vagas/leads"),
+    "jobhunter_pages_total": ("counter", "Páginas processadas por resultado (accepted/dropped/error)"),
+    "jobhunter_dropped_total": ("counter", "Itens descartados pelos filtros, por motivo"),
+    "jobhunter_runs_total": ("counter", "Execuções da busca por resultado"),
+    "jobhunter_parse_total": ("counter", "Páginas lidas dos dados estruturados, no pool de processos ou no próprio processo"),
+}
+
+
+class Registry:
+    """Séries de contadores e histogramas, chaveadas por (nome, rótulos)."""
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, key, amount):
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, key, value):
+        series = self.histograms.get(key)
+        if series is None:
+            series = self.histograms[key] = {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0, "max": 0.0}
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                series["buckets"][i] += 1
+        series["sum"] += value
+        series["count"] += 1
+        series["max"] = max(series["max"], value)
+
+
+_lock = threading.Lock()
+_total = Registry()    # acumulado desde o início do processo (/metrics)
+_run = Registry()      # só a execução atual (resumo JSON)
+_run_started = None
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name, amount=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _total.inc(key, amount)
+        _run.inc(key, amount)
+
+
+def observe(name, value, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _total.observe(key, value)
+        _run.observe(key, value)
+
+
+@contextmanager
+def timer(stage):
+    """Mede o bloco como uma etapa (jobhunter_stage_seconds{stage=...})."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe("jobhunter_stage_seconds", time.perf_counter() - start, stage=stage)
+
+
+def start_run():
+    """Zera as métricas da execução (o acumulado do /metrics continua)."""
+    global _run, _run_started
+    with _lock:
+        _run = Registry()
+        _run_started = time.time()
+
+
+def _label_text(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def render_prometheus():
+    """Todas as séries no formato texto de exposição do Prometheus (0.0.4)."""
+    with _lock:
+        counters = dict(_total.counters)
+        histograms = {k: dict(v, buckets=list(v["buckets"])) for k, v in _total.histograms.items()}
+
+    lines = []
+    names = sorted({name for name, _ in counters} | {name for name, _ in histograms})
+    for name in names:
+        kind, help_text = HELP.get(name, ("untyped", name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for (series_name, labels), value in sorted(counters.items()):
+            if series_name == name:
+                lines.append(f"{name}{_label_text(labels)} {value}")
+        for (series_name, labels), series in sorted(histograms.items()):
+            if series_name != name:
+                continue
+            for bound, count in zip(BUCKETS, series["buckets"]):
+                lines.append(f"{name}_bucket{_label_text(labels, [('le', bound)])} {count}")
+            lines.append(f"{name}_bucket{_label_text(labels, [('le', '+Inf')])} {series['count']}")
+            lines.append(f"{name}_sum{_label_text(labels)} {series['sum']:.6f}")
+            lines.append(f"{name}_count{_label_text(labels)} {series['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def run_summary():
+    """Métricas da execução atual como dict (contadores e tempos por série)."""
+    def label_str(labels):
+        return ",".join(f"{k}={v}" for k, v in labels) or "total"
+
+    with _lock:
+        summary = {"started_at": _run_started, "counters": {}, "timings": {}}
+        for (name, labels), value in sorted(_run.counters.items()):
+            summary["counters"].setdefault(name, {})[label_str(labels)] = value
+        for (name, labels), series in sorted(_run.histograms.items()):
+            summary["timings"].setdefault(name, {})[label_str(labels)] = {
+                "count": series["count"],
+                "total_seconds": round(series["sum"], 3),
+                "avg_seconds": round(series["sum"] / series["count"], 3) if series["count"] else 0,
+                "max_seconds": round(series["max"], 3),
+            }
+    return summary
+
+
+def write_run_summary(run_id, **extra):
+    """
+    Grava o resumo da execução em DATA_DIR/runs/<run_id>.json e devolve o caminho.
+    Ficam só os runs.HISTORY_LIMIT resumos mais recentes, o mesmo histórico do runs.py.
+    """
+    directory = storage.data_path("runs")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{run_id}.json")
+    summary = dict(run_summary(), run_id=run_id, finished_at=time.time(), **extra)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2, default=str)
+    _prune_summaries(directory, runs.HISTORY_LIMIT)
+    return path
+
+
+def _prune_summaries(directory, keep):
+    """Apaga os resumos mais antigos (por data de modificação) além dos `keep` mais novos."""
+    entries = [e for e in os.scandir(directory) if e.is_file() and e.name.endswith(".json")]
+    if len(entries) <= keep:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for entry in entries[keep:]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
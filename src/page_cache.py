@@ -0,0 +1,159 @@
+import json
+import os
+import threading
+import time
+
+from src import storage
+
+# Cache persistente do texto extraído das páginas (não guarda o HTML bruto).
+# Dentro de PAGE_CACHE_FRESH_TTL a entrada é usada sem rede; depois disso é
+# revalidada com GET condicional (ETag/Last-Modified) e um 304 reaproveita o texto.
+# Junto do texto ficam os campos dos dados estruturados que os filtros usam
+# (validade, cidades), para o reaproveitamento descartar igual ao primeiro download.
+DEFAULT_FRESH_TTL = 6 * 3600           # segundos sem revalidar
+DEFAULT_MAX_AGE = 7 * 24 * 3600        # entradas sem acesso há mais tempo são removidas
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024   # teto do texto armazenado (LRU acima disso)
+EVICT_EVERY = 20                       # roda a limpeza a cada N gravações
+
+_conn = None
+_lock = threading.Lock()
+_writes = 0
+_stats = {"hits": 0, "misses": 0, "stale": 0, "revalidated": 0, "stored": 0, "evicted": 0}
+
+
+def _db():
+    global _conn
+    if _conn is None:
+        _conn = storage.connect(os.getenv("PAGE_CACHE_FILE", "page_cache.sqlite3"))
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                validated_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        # Caches criados antes da coluna dos campos estruturados
+        columns = {row["name"] for row in _conn.execute("PRAGMA table_info(pages)")}
+        if "record" not in columns:
+            _conn.execute("ALTER TABLE pages ADD COLUMN record TEXT")
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_last_access ON pages(last_access)")
+        _conn.commit()
+    return _conn
+
+
+def enabled():
+    return os.getenv("PAGE_CACHE_ENABLED", "1") != "0"
+
+
+def lookup(url):
+    """
+    Retorna a entrada do cache para a URL (dict) ou None.
+    O campo `fresh` indica se ainda está dentro do TTL e pode ser usada sem rede;
+    `record` traz os campos estruturados guardados no store() (ou None).
+    """
+    if not enabled():
+        return None
+    fresh_ttl = float(os.getenv("PAGE_CACHE_FRESH_TTL", DEFAULT_FRESH_TTL))
+    now = time.time()
+    with _lock:
+        row = _db().execute(
+            "SELECT text, etag, last_modified, validated_at, record FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            _stats["misses"] += 1
+            return None
+        _db().execute("UPDATE pages SET last_access = ? WHERE url = ?", (now, url))
+        _db().commit()
+        entry = dict(row)
+        entry["record"] = json.loads(row["record"]) if row["record"] else None
+        entry["fresh"] = now - row["validated_at"] < fresh_ttl
+        _stats["hits" if entry["fresh"] else "stale"] += 1
+        return entry
+
+
+def conditional_headers(entry):
+    """Cabeçalhos If-None-Match/If-Modified-Since para revalidar uma entrada vencida."""
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def mark_revalidated(url):
+    """O servidor respondeu 304: a entrada volta a ficar fresca sem baixar nada."""
+    if not enabled():
+        return
+    now = time.time()
+    with _lock:
+        _db().execute("UPDATE pages SET validated_at = ?, last_access = ? WHERE url = ?", (now, now, url))
+        _db().commit()
+        _stats["revalidated"] += 1
+
+
+def store(url, text, etag=None, last_modified=None, record=None):
+    """Grava (ou substitui) o texto extraído da URL e, se houver, os campos estruturados (dict)."""
+    global _writes
+    if not enabled() or not text:
+        return
+    now = time.time()
+    with _lock:
+        _db().execute(
+            "INSERT OR REPLACE INTO pages (url, text, etag, last_modified, validated_at, last_access, size, record) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (url, text, etag, last_modified, now, now, len(text.encode("utf-8")),
+             json.dumps(record, ensure_ascii=False) if record else None),
+        )
+        _db().commit()
+        _stats["stored"] += 1
+        _writes += 1
+        if _writes % EVICT_EVERY == 0:
+            _evict_locked(now)
+
+
+def evict():
+    """Remove entradas expiradas e aplica o teto de tamanho (LRU)."""
+    if not enabled():
+        return
+    with _lock:
+        _evict_locked(time.time())
+
+
+def _evict_locked(now):
+    max_age = float(os.getenv("PAGE_CACHE_MAX_AGE", DEFAULT_MAX_AGE))
+    max_bytes = int(os.getenv("PAGE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+    conn = _db()
+    removed = conn.execute("DELETE FROM pages WHERE last_access < ?", (now - max_age,)).rowcount
+
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+    if total > max_bytes:
+        # Percorre do acesso mais antigo para o mais recente até caber no teto
+        excess = total - max_bytes
+        victims = []
+        for row in conn.execute("SELECT url, size FROM pages ORDER BY last_access ASC"):
+            victims.append((row["url"],))
+            excess -= row["size"]
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM pages WHERE url = ?", victims)
+        removed += len(victims)
+    conn.commit()
+    _stats["evicted"] += removed
+
+
+def stats():
+    """Contadores do cache para o /status."""
+    result = dict(_stats)
+    result["enabled"] = enabled()
+    if enabled():
+        with _lock:
+            row = _db().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+        result["entries"] = row[0]
+        result["bytes"] = row[1]
+    return result
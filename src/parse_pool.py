@@ -0,0 +1,79 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from src import filters, text_extractor
+
+# Parsing das páginas em processos separados (opcional, PARSE_WORKERS > 0).
+# O HTMLParser/BeautifulSoup é Python puro e segura o GIL: com várias threads
+# de download, o parsing das páginas pesadas (LinkedIn, Indeed) fica em fila
+# num núcleo só. Aqui só trafegam os bytes da página e o resultado pequeno
+# (texto já cortado no orçamento + motivo do descarte); páginas pequenas são
+# processadas no próprio processo, onde o IPC custaria mais que o parsing.
+DEFAULT_WORKERS = 0                 # desligado: o plano gratuito tem ~1 núcleo
+DEFAULT_MIN_BYTES = 256 * 1024
+
+_executor = None
+_lock = threading.Lock()
+
+
+def workers():
+    return int(os.getenv("PARSE_WORKERS", DEFAULT_WORKERS))
+
+
+def enabled():
+    return workers() > 0
+
+
+def min_bytes():
+    return int(os.getenv("PARSE_POOL_MIN_BYTES", DEFAULT_MIN_BYTES))
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            # spawn: o processo pai tem threads (downloads, agendador) e fork com threads é frágil
+            _executor = ProcessPoolExecutor(max_workers=workers(), mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def _reset(wait=False):
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait, cancel_futures=True)
+        _executor = None
+
+
+def _parse(content, url, max_chars, declared_encoding, full, classify):
+    """Roda no processo filho: extrai o texto e, se pedido, já aplica os filtros de vaga."""
+    text = text_extractor.bytes_to_text(content, max_chars, declared_encoding, full)
+    return text, filters.job_drop_reason(url, text) if classify else None
+
+
+def parse(content, url, max_chars=4000, declared_encoding=None, full=False, classify=False):
+    """
+    Texto da página (e o motivo de descarte, com classify=True; senão None).
+    Retorna (texto, motivo, onde: "pool" ou "local").
+    """
+    if enabled() and len(content) >= min_bytes():
+        try:
+            future = _get_executor().submit(_parse, content, url, max_chars, declared_encoding, full, classify)
+            text, reason = future.result()
+            return text, reason, "pool"
+        except BrokenProcessPool as e:
+            # Um filho morreu (ex.: falta de memória): recria o pool na próxima e segue local
+            print(f"[Aviso] Pool de parsing quebrado ({e}); processando no próprio processo.")
+            _reset()
+    text, reason = _parse(content, url, max_chars, declared_encoding, full, classify)
+    return text, reason, "local"
+
+
+@atexit.register
+def shutdown():
+    """Encerra os processos do pool (também na saída do interpretador)."""
+    _reset(wait=True)
@@ -0,0 +1,104 @@
+import os
+import queue
+import threading
+
+# Etapas da busca em threads ligadas por filas limitadas (produtor/consumidor).
+# Fila cheia segura a etapa anterior (backpressure): o DuckDuckGo não corre na
+# frente dos downloads acumulando páginas na memória, e o download da dork N
+# acontece enquanto a dork N+1 é buscada e as páginas anteriores são filtradas.
+# Se uma etapa falhar, as outras param e o erro sobe para quem consome results().
+DEFAULT_QUEUE_SIZE = 32
+
+_DONE = object()
+
+
+class Cancelled(Exception):
+    """Outra etapa falhou: esta para sem processar o resto."""
+
+
+class Pipeline:
+    """Threads de etapas + filas limitadas, com parada coordenada em caso de erro."""
+
+    def __init__(self, queue_size=None):
+        self.queue_size = max(1, queue_size or int(os.getenv("PIPELINE_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)))
+        self._threads = []
+        self._error = None
+        self._stop = threading.Event()
+
+    def queue(self):
+        return queue.Queue(maxsize=self.queue_size)
+
+    def put(self, q, item):
+        """Bloqueia enquanto a fila estiver cheia (Cancelled se o pipeline parou)."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise Cancelled()
+
+    def check(self):
+        """Cancelled se o pipeline parou (para etapas que passam tempo sem usar filas)."""
+        if self._stop.is_set():
+            raise Cancelled()
+
+    def close(self, q):
+        """Avisa a próxima etapa que não vem mais nada nesta fila."""
+        self.put(q, _DONE)
+
+    def drain(self, q):
+        """Itens da fila até ela ser fechada."""
+        while True:
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    raise Cancelled()
+                continue
+            if item is _DONE:
+                return
+            # Fila cheia nunca cai no Empty: sem esta checagem o estágio seguiria consumindo após o erro
+            if self._stop.is_set():
+                raise Cancelled()
+            yield item
+
+    def stage(self, name, target, *args):
+        """Roda target(*args) numa thread própria; o primeiro erro para o pipeline inteiro."""
+        def run():
+            try:
+                target(*args)
+            except Cancelled:
+                pass
+            except BaseException as e:
+                if self._error is None:
+                    self._error = e
+                self._stop.set()
+
+        thread = threading.Thread(target=run, name=f"pipeline-{name}", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def results(self, q):
+        """
+        Consome a última fila na thread atual, entregando cada item assim que chega.
+        Ao fim espera as etapas e repassa o erro, se houver; se quem consome parar
+        antes (break, close()), as etapas são canceladas.
+        """
+        finished = False
+        try:
+            yield from self.drain(q)
+            finished = True
+        except Cancelled:
+            finished = True
+        finally:
+            if not finished:
+                self._stop.set()
+            for thread in self._threads:
+                thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def collect(self, q):
+        """Como results(), mas devolve todos os itens numa lista."""
+        return list(self.results(q))
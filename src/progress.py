@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import deque
+
+# Progresso da busca em andamento, para o painel acompanhar por SSE (/events)
+# em vez de consultar /status a cada 3 s. Os eventos da execução atual (ou da
+# última) ficam num buffer: quem conecta no meio recebe tudo desde o início e
+# pode retomar pelo id do último evento (Last-Event-ID).
+MAX_EVENTS = 2000
+
+_cond = threading.Condition()
+_events = deque(maxlen=MAX_EVENTS)
+_seq = 0
+_state = {"running": False}
+_dork_started_at = None
+
+
+def _emit_locked(event, data):
+    global _seq
+    _seq += 1
+    _events.append((_seq, event, data))
+    _cond.notify_all()
+
+
+def queued(run_id):
+    """
+    Execução aceita (ainda na fila). Chamado antes de o /run responder, para o
+    painel que abre o /events logo em seguida não receber o buffer da execução
+    anterior (com o "done" dela). Se a fila já começou a execução, não faz nada.
+    """
+    with _cond:
+        if _state.get("run_id") == run_id:
+            return
+        _events.clear()
+        _state.clear()
+        _state.update(running=True, stage="queued", run_id=run_id, queued_at=time.time())
+        _emit_locked("progress", dict(_state))
+
+
+def start_run(**info):
+    """Zera o progresso e marca o início de uma nova execução."""
+    global _dork_started_at
+    with _cond:
+        _events.clear()
+        _state.clear()
+        _state.update({
+            "running": True,
+            "started_at": time.time(),
+            "stage": "start",
+            "dork": None,
+            "dork_index": 0,
+            "dorks_total": 0,
+            "pages_submitted": 0,
+            "pages_done": 0,
+            "accepted": 0,
+            "dropped": 0,
+            "errors": 0,
+            "cache_hits": 0,
+            "eta_seconds": None,
+        }, **info)
+        _dork_started_at = None
+        _emit_locked("progress", dict(_state))
+
+
+def stage(name):
+    with _cond:
+        _state["stage"] = name
+        _state["eta_seconds"] = None
+        _emit_locked("progress", dict(_state))
+
+
+def dork(index, total, query, cache_hits=None):
+    """Nova dork começando; o ETA usa o tempo médio das dorks anteriores."""
+    global _dork_started_at
+    now = time.time()
+    with _cond:
+        if _dork_started_at is None:
+            _dork_started_at = now
+        elif index > 1:
+            per_dork = (now - _dork_started_at) / (index - 1)
+            _state["eta_seconds"] = round(per_dork * (total - index + 1), 1)
+        _state.update(stage="jobs", dork=query, dork_index=index, dorks_total=total)
+        if cache_hits is not None:
+            _state["cache_hits"] = cache_hits
+        _emit_locked("progress", dict(_state))
+
+
+def page_submitted():
+    with _cond:
+        _state["pages_submitted"] = _state.get("pages_submitted", 0) + 1
+
+
+def page_done(url, status, cache_hits=None):
+    """Uma página terminou (accepted/dropped/error); vagas aceitas viram evento "job"."""
+    with _cond:
+        _state["pages_done"] = _state.get("pages_done", 0) + 1
+        key = {"accepted": "accepted", "dropped": "dropped"}.get(status, "errors")
+        _state[key] = _state.get(key, 0) + 1
+        if cache_hits is not None:
+            _state["cache_hits"] = cache_hits
+        if status == "accepted":
+            _emit_locked("job", {"url": url})
+        _emit_locked("progress", dict(_state))
+
+
+def finish(**summary):
+    with _cond:
+        _state.update(running=False, stage="done", eta_seconds=0, finished_at=time.time(), **summary)
+        _emit_locked("done", dict(_state))
+
+
+def running():
+    with _cond:
+        return _state.get("running", False)
+
+
+def snapshot():
+    with _cond:
+        return dict(_state)
+
+
+def events_since(seq, timeout=15):
+    """Eventos com id > seq; espera até `timeout` segundos se ainda não houver nenhum."""
+    with _cond:
+        if _seq <= seq:
+            _cond.wait(timeout)
+        # Buffer reiniciado (nova execução) ou cliente muito atrasado: manda tudo que houver
+        return [e for e in _events if e[0] > seq]
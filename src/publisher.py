@@ -0,0 +1,153 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+from src import storage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Publicação atômica e versionada do painel. Cada versão vira arquivos imutáveis
+# em DATA_DIR/dashboard/ nomeados pelo hash do conteúdo (html, .gz e .br já
+# comprimidos). O manifesto current.json é trocado por último com os.replace,
+# então o /vagas sempre enxerga uma versão completa, nunca um arquivo pela metade.
+DASHBOARD_DIR = "dashboard"
+MANIFEST = "current.json"
+KEEP_VERSIONS = 3             # versões antigas mantidas para quem ainda está baixando
+DEFAULT_BROTLI_QUALITY = 9    # 11 leva dezenas de segundos num painel grande, ganho ~10%
+SUFFIXES = {"identity": ".html", "gzip": ".html.gz", "br": ".html.br"}
+
+_lock = threading.Lock()
+
+
+def _dir():
+    path = os.path.abspath(storage.data_path(DASHBOARD_DIR))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _replace_atomic(src, dst):
+    """Coloca uma cópia de `src` em `dst` de uma vez (hardlink + rename; cópia se não der)."""
+    tmp = f"{dst}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def publish(parts, output_path=None):
+    """
+    Escreve os pedaços (strings) do painel como uma nova versão e a torna a atual.
+    Gera junto as variantes gzip/brotli e, se `output_path` for dado, troca também
+    aquele arquivo atomicamente (para abrir o painel localmente). Retorna o manifesto.
+    """
+    directory = _dir()
+    prefix = os.path.join(directory, f"tmp-{os.getpid()}-{threading.get_ident()}")
+    quality = int(os.getenv("DASHBOARD_BROTLI_QUALITY", DEFAULT_BROTLI_QUALITY))
+    compressor = brotli.Compressor(quality=quality) if brotli is not None else None
+    encodings = list(SUFFIXES) if compressor is not None else ["identity", "gzip"]
+    tmp_paths = {enc: prefix + SUFFIXES[enc] for enc in encodings}
+
+    digest = hashlib.sha256()
+    size = 0
+    br_file = open(tmp_paths["br"], "wb") if compressor is not None else None
+    try:
+        with open(tmp_paths["identity"], "wb") as raw, \
+                gzip.GzipFile(tmp_paths["gzip"], "wb", compresslevel=6, mtime=0) as gz:
+            for part in parts:
+                data = part.encode("utf-8")
+                digest.update(data)
+                size += len(data)
+                raw.write(data)
+                gz.write(data)
+                if compressor is not None:
+                    br_file.write(compressor.process(data))
+            if compressor is not None:
+                br_file.write(compressor.finish())
+    except BaseException:
+        for path in tmp_paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    finally:
+        if br_file is not None:
+            br_file.close()
+
+    etag = digest.hexdigest()[:32]
+    files = {}
+    for encoding, tmp in tmp_paths.items():
+        name = etag + SUFFIXES[encoding]
+        # Conteúdo igual = mesmo nome: a versão já publicada é reaproveitada
+        os.replace(tmp, os.path.join(directory, name))
+        files[encoding] = name
+
+    manifest = {"etag": etag, "size": size, "built_at": time.time(), "files": files}
+    with _lock:
+        manifest_tmp = os.path.join(directory, f"{MANIFEST}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(manifest_tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(manifest_tmp, os.path.join(directory, MANIFEST))
+        if output_path:
+            _replace_atomic(os.path.join(directory, files["identity"]), output_path)
+        _prune(directory, etag)
+    return manifest
+
+
+def _prune(directory, current_etag):
+    """Apaga as versões além das KEEP_VERSIONS mais recentes (nunca a atual)."""
+    versions = {}
+    for name in os.listdir(directory):
+        if name.endswith(".html"):
+            etag = name[:-len(".html")]
+            if not etag.startswith("tmp-"):
+                versions[etag] = os.path.getmtime(os.path.join(directory, name))
+    old = sorted(versions, key=versions.get, reverse=True)[KEEP_VERSIONS:]
+    for etag in old:
+        if etag == current_etag:
+            continue
+        for suffix in SUFFIXES.values():
+            try:
+                os.remove(os.path.join(directory, etag + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def current():
+    """Manifesto da versão publicada (etag, arquivos por encoding) ou None se não houver."""
+    directory = _dir()
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    manifest["paths"] = {enc: os.path.join(directory, name) for enc, name in manifest["files"].items()}
+    return manifest
+
+
+def warm_start(snapshot_path=None):
+    """
+    Prepara o primeiro /vagas logo na subida do serviço. Com uma versão publicada,
+    lê os arquivos uma vez (ficam no cache do sistema); sem versão (ou com arquivos
+    faltando), publica o `snapshot_path` — o painel_vagas.html da última busca —
+    sem precisar renderizar nada. Retorna o manifesto atual ou None.
+    """
+    manifest = current()
+    if manifest is not None and all(os.path.exists(path) for path in manifest["paths"].values()):
+        for path in manifest["paths"].values():
+            with open(path, "rb") as f:
+                while f.read(1 << 20):
+                    pass
+        return manifest
+    if snapshot_path and os.path.exists(snapshot_path):
+        with open(snapshot_path, encoding="utf-8") as f:
+            publish(iter(lambda: f.read(65536), ""))
+        print(f"[*] Painel restaurado do snapshot {snapshot_path}")
+        return current()
+    return None
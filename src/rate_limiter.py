@@ -0,0 +1,120 @@
+import os
+import random
+import threading
+import time
+
+# Limitadores adaptativos (token bucket + AIMD) compartilhados pelo projeto.
+# Cada serviço começa numa taxa inicial (req/s), sobe aos poucos enquanto as
+# respostas vêm OK e corta pela metade ao receber 429/RESOURCE_EXHAUSTED,
+# ficando bloqueado por um backoff exponencial com jitter.
+# Override via .env: RATE_LIMIT_<NOME>="inicial,mínima,máxima" (ex.: RATE_LIMIT_DDG="0.25,0.05,0.5")
+DEFAULT_LIMITS = {
+    "ddg": (0.25, 0.05, 0.5),        # ~1 busca a cada 4s, nunca mais que 1 a cada 2s
+    "gemini": (0.2, 1 / 60, 1.0),
+    "telegram": (1.0, 0.05, 1.0),    # Telegram aceita ~1 msg/s por chat
+    "domain": (1.0, 0.1, 4.0),       # padrão para cada site de vagas
+}
+MAX_BACKOFF = 120.0
+
+
+class RateLimiter:
+    """Token bucket cuja taxa se ajusta por AIMD (aumento aditivo, corte multiplicativo)."""
+
+    def __init__(self, name, rate, min_rate, max_rate, burst=1):
+        self.name = name
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._strikes = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloqueia até haver uma ficha disponível (e o backoff ter passado)."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # A ficha é reservada já aqui (saldo pode ficar negativo), assim cada
+            # thread calcula sua própria espera e dorme fora do lock
+            self._tokens -= 1
+            wait = max(-self._tokens / self.rate, self._blocked_until - now, 0.0)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_success(self):
+        """Resposta OK: aumenta a taxa um degrau e zera a sequência de falhas."""
+        with self._lock:
+            self._strikes = 0
+            self.rate = min(self.max_rate, self.rate + (self.max_rate - self.min_rate) / 20)
+
+    def on_throttle(self, retry_after=None):
+        """Upstream pediu calma: corta a taxa pela metade e agenda o backoff. Retorna a espera."""
+        with self._lock:
+            self._strikes += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after:
+                delay = float(retry_after) + random.uniform(0, 1)
+            else:
+                delay = min(MAX_BACKOFF, (1 / self.rate) * 2 ** (self._strikes - 1))
+                delay *= random.uniform(0.5, 1.5)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            return delay
+
+    def blocked_for(self):
+        """Segundos que ainda faltam do backoff (0 se liberado)."""
+        with self._lock:
+            return max(0.0, self._blocked_until - time.monotonic())
+
+    def snapshot(self):
+        return {"rate": round(self.rate, 4), "strikes": self._strikes, "blocked_for": round(self.blocked_for(), 1)}
+
+
+_limiters = {}
+_registry_lock = threading.Lock()
+
+
+def _limits_for(kind):
+    raw = os.getenv(f"RATE_LIMIT_{kind.upper()}")
+    if raw:
+        try:
+            rate, min_rate, max_rate = (float(v) for v in raw.split(","))
+            return rate, min_rate, max_rate
+        except ValueError:
+            print(f"[Aviso] RATE_LIMIT_{kind.upper()} inválido ({raw}), usando o padrão.")
+    return DEFAULT_LIMITS[kind]
+
+
+def get(name):
+    """
+    Limitador compartilhado pelo nome: "ddg", "gemini", "telegram" ou
+    "domain:<host>" (um por site de vagas, todos com os limites de "domain").
+    """
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _registry_lock:
+            limiter = _limiters.get(name)
+            if limiter is None:
+                kind = "domain" if name.startswith("domain:") else name
+                limiter = RateLimiter(name, *_limits_for(kind))
+                _limiters[name] = limiter
+    return limiter
+
+
+def for_domain(domain):
+    return get(f"domain:{domain}")
+
+
+def is_throttle_error(error):
+    """Reconhece erros de limite de taxa vindos de SDKs (DDGS, Gemini)."""
+    msg = f"{type(error).__name__} {error}"
+    return any(tag in msg for tag in ("429", "Quota", "RESOURCE_EXHAUSTED", "Ratelimit", "RateLimit"))
+
+
+def stats():
+    """Taxa atual de cada limitador (para o /status)."""
+    return {name: limiter.snapshot() for name, limiter in list(_limiters.items())}
@@ -0,0 +1,100 @@
+import os
+import sys
+import tempfile
+import threading
+
+from src import storage
+from src.fetcher import domain_of
+
+# Registro compacto de uma vaga encontrada. Uma execução (ou o painel, com o
+# histórico do índice) chega a milhares de vagas com até 4000 caracteres cada:
+# __slots__ no lugar do dict por vaga, o domínio internado (centenas de vagas
+# dividem a mesma string) e, com JOB_TEXT_SPILL=1, o texto num arquivo
+# temporário do DATA_DIR, lido de volta só quando alguém pede job.text.
+FIELDS = ("url", "domain", "text", "verdict", "score", "alternate_urls")
+
+
+class TextSpill:
+    """Arquivo temporário com os textos das vagas; cada registro guarda só (offset, tamanho)."""
+
+    def __init__(self):
+        # Apagado pelo sistema ao fechar: vive enquanto algum registro apontar para ele
+        self._file = tempfile.TemporaryFile(prefix="spill-", dir=os.path.dirname(storage.data_path("spill")))
+        self._lock = threading.Lock()
+        self._size = 0
+
+    def write(self, text):
+        data = text.encode("utf-8")
+        # seek + write/read sob a trava (os.pwrite/pread não existem no Windows)
+        with self._lock:
+            offset = self._size
+            self._file.seek(offset)
+            self._file.write(data)
+            self._size += len(data)
+        return offset, len(data)
+
+    def read(self, offset, length):
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(length).decode("utf-8")
+
+
+def text_spill():
+    """TextSpill novo se JOB_TEXT_SPILL=1, senão None (textos na memória)."""
+    return TextSpill() if os.getenv("JOB_TEXT_SPILL", "0") == "1" else None
+
+
+class JobRecord:
+    """
+    Vaga: URL, domínio, texto e, se passou pela IA, veredito e nota.
+    Lê como os dicts que substitui (job["url"], job.get("alternate_urls", [])).
+    """
+
+    __slots__ = ("url", "domain", "verdict", "score", "alternate_urls", "_text", "_spill")
+
+    def __init__(self, url, text="", verdict=None, score=None, alternate_urls=None, spill=None):
+        self.url = url
+        self.domain = sys.intern(domain_of(url))
+        self.verdict = verdict
+        self.score = score
+        self.alternate_urls = alternate_urls
+        self._set_text(text, spill)
+
+    def _set_text(self, text, spill=None):
+        self._spill = spill if text else None
+        self._text = spill.write(text) if self._spill else (text or "")
+
+    @property
+    def text(self):
+        return self._spill.read(*self._text) if self._spill else self._text
+
+    def replace(self, **changes):
+        """Cópia com os campos alterados; o texto já gravado em disco não é regravado."""
+        clone = JobRecord.__new__(JobRecord)
+        for name in JobRecord.__slots__:
+            setattr(clone, name, getattr(self, name))
+        if "text" in changes:
+            clone._set_text(changes.pop("text"))
+        for name, value in changes.items():
+            setattr(clone, name, value)
+        return clone
+
+    def __getitem__(self, key):
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        value = getattr(self, key) if key in FIELDS else None
+        return default if value is None else value
+
+    def __repr__(self):
+        return f"JobRecord({self.url!r})"
+
+
+def job_record(job, spill=None):
+    """JobRecord a partir de um dict de vaga (um JobRecord passa direto)."""
+    if isinstance(job, JobRecord):
+        return job
+    return JobRecord(job["url"], job.get("text") or "", job.get("verdict"), job.get("score"),
+                     job.get("alternate_urls"), spill)
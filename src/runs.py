@@ -0,0 +1,198 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+
+from src import storage
+
+# Registro das execuções da busca (substitui a flag global IS_SEARCHING).
+# A trava de "uma busca por vez" fica no SQLite: a checagem e a inserção da nova
+# execução acontecem na mesma transação BEGIN IMMEDIATE, então dois /run quase
+# simultâneos (mesmo em workers diferentes do gunicorn) não passam juntos.
+# A execução ativa renova um "lease"; se o processo morrer, o lease vence e a
+# próxima chamada marca a execução como interrompida e segue.
+QUEUED = "queued"
+RUNNING = "running"
+FINISHED = "finished"
+FAILED = "failed"
+ACTIVE = (QUEUED, RUNNING)
+
+DEFAULT_LEASE_SECONDS = 120
+HISTORY_LIMIT = 200
+
+_conn = None
+_lock = threading.Lock()
+_queue = queue.Queue()
+_worker = None
+
+
+class Busy(Exception):
+    """Outro worker está criando uma execução agora (banco travado): tente de novo em instantes."""
+
+
+def _db():
+    global _conn
+    if _conn is None:
+        # isolation_level=None: transações controladas à mão (BEGIN IMMEDIATE)
+        _conn = storage.connect(os.getenv("RUNS_FILE", "runs.sqlite3"))
+        _conn.isolation_level = None
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id TEXT PRIMARY KEY,
+                trigger TEXT,
+                status TEXT NOT NULL,
+                queued_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                duration REAL,
+                lease_until REAL,
+                summary TEXT,
+                error TEXT
+            )
+        """)
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_status ON runs(status)")
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_queued ON runs(queued_at)")
+    return _conn
+
+
+def _lease_seconds():
+    return float(os.getenv("RUN_LEASE_SECONDS", DEFAULT_LEASE_SECONDS))
+
+
+def _row_to_dict(row):
+    run = dict(row)
+    run.pop("lease_until", None)
+    run["summary"] = json.loads(run["summary"]) if run["summary"] else None
+    if run["status"] == RUNNING and run["started_at"]:
+        run["duration"] = round(time.time() - run["started_at"], 1)
+    return run
+
+
+def submit(task, trigger="manual"):
+    """
+    Enfileira `task(run_id)` como nova execução, se não houver outra ativa.
+    Retorna (id da execução, criada?): com uma busca já ativa, devolve o id dela e False.
+    Busy se outro worker estiver segurando a transação.
+    """
+    now = time.time()
+    run_id = uuid.uuid4().hex[:12]
+    with _lock:
+        conn = _db()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError as e:
+            # Outro worker segurando a transação: ele está criando uma execução agora
+            raise Busy(str(e)) from e
+        try:
+            # Execuções cujo processo morreu (lease vencido) não bloqueiam para sempre
+            conn.execute(
+                f"UPDATE runs SET status = ?, error = ?, finished_at = ? "
+                f"WHERE status IN ({', '.join('?' * len(ACTIVE))}) AND lease_until < ?",
+                (FAILED, "interrompida (lease vencido)", now, *ACTIVE, now),
+            )
+            active = conn.execute(
+                f"SELECT id FROM runs WHERE status IN ({', '.join('?' * len(ACTIVE))}) ORDER BY queued_at LIMIT 1",
+                ACTIVE,
+            ).fetchone()
+            if active is not None:
+                conn.execute("COMMIT")
+                return active["id"], False
+            conn.execute(
+                "INSERT INTO runs (id, trigger, status, queued_at, lease_until) VALUES (?, ?, ?, ?, ?)",
+                (run_id, trigger, QUEUED, now, now + _lease_seconds()),
+            )
+            conn.execute(
+                "DELETE FROM runs WHERE id NOT IN (SELECT id FROM runs ORDER BY queued_at DESC LIMIT ?)",
+                (HISTORY_LIMIT,),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    _queue.put((run_id, task))
+    _ensure_worker()
+    return run_id, True
+
+
+def _ensure_worker():
+    global _worker
+    with _lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_work, name="run-queue", daemon=True)
+            _worker.start()
+
+
+def _update(run_id, **fields):
+    columns = ", ".join(f"{name} = ?" for name in fields)
+    with _lock:
+        _db().execute(f"UPDATE runs SET {columns} WHERE id = ?", (*fields.values(), run_id))
+
+
+def _heartbeat(run_id, stop):
+    interval = _lease_seconds() / 4
+    while not stop.wait(interval):
+        _update(run_id, lease_until=time.time() + _lease_seconds())
+
+
+def _work():
+    while True:
+        run_id, task = _queue.get()
+        try:
+            _execute(run_id, task)
+        except Exception as e:
+            # Falha do próprio registro (banco travado, disco cheio...): a fila segue
+            print(f"Erro ao registrar a execução {run_id}: {e}")
+            traceback.print_exc()
+            try:
+                _update(run_id, status=FAILED, finished_at=time.time(), lease_until=None, error=str(e))
+            except Exception:
+                # Sem como gravar: o lease vence e o próximo submit marca a execução como interrompida
+                traceback.print_exc()
+        finally:
+            _queue.task_done()
+
+
+def _execute(run_id, task):
+    started = time.time()
+    _update(run_id, status=RUNNING, started_at=started, lease_until=started + _lease_seconds())
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(run_id, stop), daemon=True).start()
+    try:
+        summary = task(run_id) or {}
+        status, error = FINISHED, None
+    except Exception as e:
+        print(f"Erro crítico na execução {run_id}: {e}")
+        traceback.print_exc()
+        summary, status, error = {}, FAILED, str(e)
+    finally:
+        stop.set()
+    finished = time.time()
+    _update(run_id, status=status, finished_at=finished, duration=round(finished - started, 1),
+            lease_until=None, summary=json.dumps(summary, default=str), error=error)
+
+
+def get(run_id):
+    with _lock:
+        row = _db().execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+    return _row_to_dict(row) if row else None
+
+
+def active():
+    """Execução na fila ou rodando (com lease válido), ou None."""
+    with _lock:
+        row = _db().execute(
+            f"SELECT * FROM runs WHERE status IN ({', '.join('?' * len(ACTIVE))}) AND lease_until >= ? "
+            "ORDER BY queued_at LIMIT 1",
+            (*ACTIVE, time.time()),
+        ).fetchone()
+    return _row_to_dict(row) if row else None
+
+
+def recent(limit=10):
+    with _lock:
+        rows = _db().execute("SELECT * FROM runs ORDER BY queued_at DESC LIMIT ?", (limit,)).fetchall()
+    return [_row_to_dict(row) for row in rows]
@@ -0,0 +1,98 @@
+import os
+from datetime import datetime, timedelta
+
+import pytz
+
+from src import rate_limiter, runs
+
+# Agendador dentro do serviço web: dispara a busca nos horários de Manaus sem
+# depender de alguém chamar /run. Cada horário pode ser dividido em fatias
+# (SCHEDULE_SLOTS): a fatia k roda só 1/N das dorks, k * SCHEDULE_SLOT_MINUTES
+# minutos depois do horário cheio, espalhando a carga no DuckDuckGo.
+# Quem garante "uma busca por vez" é src/runs.py: um disparo com outra
+# execução ativa (inclusive em outro worker) é simplesmente pulado.
+MANAUS_TZ = pytz.timezone('America/Manaus')
+
+DEFAULT_HOURS = "8,18,20"
+DEFAULT_JITTER = 300              # segundos de variação aleatória em cada disparo
+DEFAULT_SLOTS = 1
+DEFAULT_SLOT_MINUTES = 20
+DEFAULT_THROTTLE_DELAY = 600      # adiamento quando o DuckDuckGo está em backoff
+MAX_POSTPONES = 3
+
+_scheduler = None
+
+
+def _hours():
+    return [int(h) for h in os.getenv("SCHEDULE_HOURS", DEFAULT_HOURS).split(",") if h.strip()]
+
+
+def _throttled():
+    """Segundos de espera sugeridos se o limitador do DuckDuckGo ainda estiver se recuperando."""
+    ddg = rate_limiter.get("ddg")
+    blocked = ddg.blocked_for()
+    if blocked > 0 or ddg.snapshot()["strikes"] > 0:
+        return max(blocked, float(os.getenv("SCHEDULE_THROTTLE_DELAY", DEFAULT_THROTTLE_DELAY)))
+    return 0
+
+
+def _fire(submit, part, parts, postponed=0):
+    """Dispara uma fatia; com o DuckDuckGo em backoff, adia (até MAX_POSTPONES vezes)."""
+    label = "busca completa" if parts == 1 else f"fatia {part + 1}/{parts}"
+    delay = _throttled()
+    if delay and postponed < MAX_POSTPONES:
+        run_at = datetime.now(MANAUS_TZ) + timedelta(seconds=delay)
+        print(f"[Agendador] DuckDuckGo em backoff; {label} adiada para {run_at.strftime('%H:%M:%S')}.")
+        _scheduler.add_job(_fire, "date", run_date=run_at, args=(submit, part, parts, postponed + 1))
+        return
+
+    try:
+        run_id, created = submit(part if parts > 1 else None, parts)
+    except runs.Busy:
+        print(f"[Agendador] {label} pulada: outra execução está sendo criada agora.")
+        return
+    if created:
+        print(f"[Agendador] {label} iniciada (execução {run_id}).")
+    else:
+        print(f"[Agendador] {label} pulada: execução {run_id} ainda em andamento.")
+
+
+def start(submit):
+    """
+    Inicia o agendador (uma vez por processo). `submit(part, parts)` deve enfileirar
+    a busca e devolver (run_id, criada?), como src/runs.submit.
+    """
+    global _scheduler
+    if _scheduler is not None or os.getenv("SCHEDULER_ENABLED", "1") == "0":
+        return _scheduler
+    # Importado aqui: o APScheduler não precisa atrasar a subida do /ping e do /vagas
+    from apscheduler.schedulers.background import BackgroundScheduler
+
+    jitter = int(os.getenv("SCHEDULE_JITTER", DEFAULT_JITTER))
+    slots = max(1, int(os.getenv("SCHEDULE_SLOTS", DEFAULT_SLOTS)))
+    slot_minutes = int(os.getenv("SCHEDULE_SLOT_MINUTES", DEFAULT_SLOT_MINUTES))
+
+    # coalesce: disparos perdidos (serviço dormindo) viram um só; max_instances=1 por fatia
+    _scheduler = BackgroundScheduler(
+        timezone=MANAUS_TZ,
+        job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": 15 * 60},
+    )
+    for hour in _hours():
+        for part in range(slots):
+            start_at = datetime(2000, 1, 1, hour) + timedelta(minutes=part * slot_minutes)
+            _scheduler.add_job(
+                _fire, "cron", hour=start_at.hour, minute=start_at.minute, jitter=jitter,
+                args=(submit, part, slots), id=f"busca-{hour:02d}h-{part}",
+            )
+    _scheduler.start()
+    for job in _scheduler.get_jobs():
+        print(f"[Agendador] {job.id}: próxima execução em {job.next_run_time}")
+    return _scheduler
+
+
+def jobs():
+    """Próximos disparos, para o /status."""
+    if _scheduler is None:
+        return []
+    return [{"id": job.id, "next_run": job.next_run_time.isoformat() if job.next_run_time else None}
+            for job in _scheduler.get_jobs()]
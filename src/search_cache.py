@@ -0,0 +1,71 @@
+import json
+import os
+import threading
+import time
+
+from src import storage
+
+# Cache persistente dos resultados do DuckDuckGo por (consulta, nº de resultados).
+# Dentro do TTL a mesma dork não volta a consultar o DDGS nem paga a pausa anti-bloqueio.
+DEFAULT_TTL = 6 * 3600
+
+_conn = None
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _db():
+    global _conn
+    if _conn is None:
+        _conn = storage.connect(os.getenv("SEARCH_CACHE_FILE", "search_cache.sqlite3"))
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS searches (
+                query TEXT NOT NULL,
+                num_results INTEGER NOT NULL,
+                urls TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (query, num_results)
+            )
+        """)
+        _conn.commit()
+    return _conn
+
+
+def _ttl():
+    return float(os.getenv("SEARCH_CACHE_TTL", DEFAULT_TTL))
+
+
+def lookup(query, num_results):
+    """Lista de URLs em cache para a consulta, ou None se não houver/estiver vencida."""
+    if _ttl() <= 0:
+        return None
+    with _lock:
+        row = _db().execute(
+            "SELECT urls, fetched_at FROM searches WHERE query = ? AND num_results = ?",
+            (query, num_results),
+        ).fetchone()
+        if row is None or time.time() - row["fetched_at"] >= _ttl():
+            _stats["misses"] += 1
+            return None
+        _stats["hits"] += 1
+        return json.loads(row["urls"])
+
+
+def store(query, num_results, urls):
+    """Grava o resultado de uma consulta bem-sucedida e remove as vencidas."""
+    if _ttl() <= 0:
+        return
+    now = time.time()
+    with _lock:
+        conn = _db()
+        conn.execute(
+            "INSERT OR REPLACE INTO searches (query, num_results, urls, fetched_at) VALUES (?, ?, ?, ?)",
+            (query, num_results, json.dumps(urls), now),
+        )
+        conn.execute("DELETE FROM searches WHERE fetched_at < ?", (now - _ttl(),))
+        conn.commit()
+
+
+def stats():
+    """Contadores do cache de buscas para o /status."""
+    return dict(_stats, ttl=_ttl())
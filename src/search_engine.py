@@ -1,50 +1,616 @@
+import functools
+import html as html_lib
+import json
+import operator
 import os
+import re
+import threading
 import time
-import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import wait
 
-from ddgs import DDGS
+from src import dedup, filters, http_client, job_index, metrics, page_cache, parse_pool, pipeline, progress, rate_limiter, records, search_cache, text_extractor, user_state
+from src.fetcher import PageFetcher, domain_of
+
+# Resumo da última execução (exposto no /status)
+LAST_RUN_STATS = {}
+
+# Cliente do DuckDuckGo, importado na primeira busca (ver _ddgs)
+DDGS = None
+
+DDG_ATTEMPTS = 3
+
+# Orçamento da extração em modo stream: as vagas usam só text[:4000] e os leads 300
+DEFAULT_EXTRACT_MAX_CHARS = 4000
+DEFAULT_EXTRACT_MAX_BYTES = 2 * 1024 * 1024
+
+def _ddgs():
+    """Classe DDGS, importada só quando a primeira busca acontece (o pacote é pesado)."""
+    global DDGS
+    if DDGS is None:
+        from ddgs import DDGS as ddgs_class
+        DDGS = ddgs_class
+    return DDGS
 
 def duckduckgo_search_jobs(query, num_results=5):
     """Realiza a busca usando DuckDuckGo Search (sem necessidade de chaves)."""
-    urls = []
+    cached = search_cache.lookup(query, num_results)
+    if cached is not None:
+        print(f"[cache] Resultado reaproveitado para: {query}")
+        return cached
+
+    # Ritmo adaptativo no lugar da pausa fixa: acelera enquanto o DDG responde
+    # bem e recua com backoff exponencial quando ele começa a bloquear
+    limiter = rate_limiter.get("ddg")
+    ddgs_class = _ddgs()
     print(f"Buscando com DuckDuckGo: {query}")
+    for attempt in range(DDG_ATTEMPTS):
+        limiter.acquire()
+        urls = []
+        try:
+            with metrics.timer("search"), ddgs_class() as ddgs:
+                # max_results controla quantas paginas ele traz
+                # timelimit='m' garante resultados apenas do ultimo mes (vagas recentes/ativas)
+                results = ddgs.text(query, max_results=num_results, timelimit='m')
+                for res in results:
+                    if 'href' in res:
+                        urls.append(res['href'])
+        except Exception as e:
+            if rate_limiter.is_throttle_error(e):
+                delay = limiter.on_throttle()
+                print(f"    [Aviso] DuckDuckGo limitou as buscas. Nova tentativa em {delay:.1f}s ({attempt+1}/{DDG_ATTEMPTS})")
+                continue
+            print(f"Erro na API do DuckDuckGo: {e}")
+            return urls
+
+        limiter.on_success()
+        search_cache.store(query, num_results, urls)
+        return urls
+
+    print(f"Erro na API do DuckDuckGo: limite de taxa persistente para {query}")
+    return []
+
+# Dados estruturados por board: o bloco JSON-LD schema.org/JobPosting (ou o JSON
+# de estado da página) já traz título, empresa, cidade e datas exatas, e sai bem
+# mais barato que achatar o DOM inteiro. O texto da página fica como reserva.
+DEFAULT_STRUCTURED_SCAN_BYTES = 512 * 1024
+
+_LD_JSON = re.compile(r'<script[^>]+application/ld\+json[^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+_NEXT_DATA = re.compile(r'<script[^>]+id=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+_STRUCTURED_MARKERS = (b"ld+json", b"__NEXT_DATA__")
+
+
+def _first(value):
+    return value[0] if isinstance(value, list) and value else value
+
+
+def _name(value):
+    value = _first(value)
+    if isinstance(value, dict):
+        return value.get("name")
+    return value if isinstance(value, str) else None
+
+
+def _find_job_posting(data):
+    """Primeiro objeto @type JobPosting num JSON-LD (objeto, lista ou @graph)."""
+    if isinstance(data, list):
+        for item in data:
+            found = _find_job_posting(item)
+            if found:
+                return found
+    elif isinstance(data, dict):
+        kind = data.get("@type")
+        if kind == "JobPosting" or (isinstance(kind, list) and "JobPosting" in kind):
+            return data
+        if "@graph" in data:
+            return _find_job_posting(data["@graph"])
+    return None
+
+
+def _json_ld_posting(html):
+    """Extrator padrão: bloco <script type="application/ld+json"> com um JobPosting."""
+    for block in _LD_JSON.findall(html):
+        try:
+            posting = _find_job_posting(json.loads(block.strip(), strict=False))
+        except ValueError:
+            continue
+        if not posting or not posting.get("title"):
+            continue
+        locations = posting.get("jobLocation") or []
+        # cities e regions ficam alinhadas (região vazia quando o board não informa)
+        cities, regions = [], []
+        for location in locations if isinstance(locations, list) else [locations]:
+            address = location.get("address") if isinstance(location, dict) else None
+            if isinstance(address, dict):
+                city, region = address.get("addressLocality"), _name(address.get("addressRegion"))
+            else:
+                city, region = address, None
+            if isinstance(city, str) and city.strip():
+                cities.append(city.strip())
+                regions.append(region.strip() if isinstance(region, str) else "")
+        return {
+            "source": "json-ld",
+            "title": posting.get("title"),
+            "company": _name(posting.get("hiringOrganization")),
+            "cities": cities,
+            "regions": regions,
+            "date_posted": posting.get("datePosted"),
+            "valid_through": posting.get("validThrough"),
+            "remote": str(posting.get("jobLocationType", "")).upper() == "TELECOMMUTE",
+            "description": posting.get("description") or "",
+        }
+    return None
+
+
+def _next_data_posting(html):
+    """Gupy (Next.js): a vaga vem no JSON do <script id="__NEXT_DATA__">."""
+    match = _NEXT_DATA.search(html)
+    if not match:
+        return None
     try:
-        with DDGS() as ddgs:
-            # max_results controla quantas paginas ele traz
-            # timelimit='m' garante resultados apenas do ultimo mes (vagas recentes/ativas)
-            results = ddgs.text(query, max_results=num_results, timelimit='m')
-            for res in results:
-                if 'href' in res:
-                    urls.append(res['href'])
-    except Exception as e:
-        print(f"Erro na API do DuckDuckGo: {e}")
-        
-    return urls
+        props = json.loads(match.group(1), strict=False).get("props", {}).get("pageProps", {})
+    except (ValueError, AttributeError):
+        return None
+    job = props.get("job") or props.get("jobData")
+    if not isinstance(job, dict) or not (job.get("name") or job.get("title")):
+        return None
+    workplace = str(job.get("workplaceType") or "").lower()
+    return {
+        "source": "next-data",
+        "title": job.get("name") or job.get("title"),
+        "company": job.get("careerPageName") or _name(job.get("company")),
+        "cities": [job["addressCity"]] if job.get("addressCity") else [],
+        "regions": [job.get("addressState") or ""] if job.get("addressCity") else [],
+        "date_posted": job.get("publishedDate"),
+        "valid_through": job.get("applicationDeadline"),
+        "remote": workplace == "remote" or bool(job.get("isRemoteWork")),
+        "description": job.get("description") or "",
+    }
+
+
+# Sufixo do domínio -> extratores tentados em ordem; boards fora daqui vão direto para o texto
+STRUCTURED_EXTRACTORS = {
+    "gupy.io": (_json_ld_posting, _next_data_posting),
+    "indeed.com": (_json_ld_posting,),
+    "greenhouse.io": (_json_ld_posting,),
+    "lever.co": (_json_ld_posting,),
+    "solides.jobs": (_json_ld_posting,),
+    "linkedin.com": (_json_ld_posting,),
+    "vagas.com.br": (_json_ld_posting,),
+}
+
+
+def structured_extractors(url):
+    if os.getenv("STRUCTURED_EXTRACT", "1") == "0":
+        return ()
+    domain = domain_of(url)
+    for suffix, extractors in STRUCTURED_EXTRACTORS.items():
+        if domain == suffix or domain.endswith("." + suffix):
+            return extractors
+    return ()
+
+
+def extract_structured(content, extractors, declared_encoding=None):
+    """Registro estruturado da vaga (dict) a partir do HTML em bytes, ou None."""
+    if not extractors or not any(marker in content for marker in _STRUCTURED_MARKERS):
+        return None
+    html = content.decode(text_extractor.sniff_encoding(content, declared_encoding), errors="replace")
+    for extractor in extractors:
+        record = extractor(html)
+        if record:
+            return record
+    return None
+
+
+def structured_text(record, max_chars):
+    """Texto da vaga montado do registro: cabeçalho com os campos exatos + descrição sem HTML."""
+    location = ", ".join("/".join(filter(None, pair)) for pair in zip(record["cities"], record["regions"]))
+    header = " - ".join(filter(None, [record["title"], record["company"], location]))
+    details = []
+    if record["remote"]:
+        details.append("Remoto")
+    if record["date_posted"]:
+        details.append(f"Publicada em {record['date_posted']}")
+    if record["valid_through"]:
+        details.append(f"Inscrições até {record['valid_through']}")
+    description = record["description"]
+    if "&lt;" in description:
+        description = html_lib.unescape(description)
+    body = text_extractor.bytes_to_text(description.encode("utf-8"), max_chars, "utf-8")
+    text = ". ".join(filter(None, [header, ". ".join(details), body]))
+    return text[:max_chars] if max_chars else text
+
+
+class _StructuredScan:
+    """
+    Procura os dados estruturados nos blocos enquanto eles seguem para o parser de
+    texto (guarda no máximo STRUCTURED_SCAN_BYTES). Sem marcador à vista, o parser
+    para no orçamento de caracteres como sempre; com o registro completo, feed()
+    encerra os blocos e o parser para ali.
+    """
+
+    def __init__(self, extractors, declared_encoding):
+        self.extractors = extractors
+        self.declared_encoding = declared_encoding
+        self.limit = int(os.getenv("STRUCTURED_SCAN_BYTES", DEFAULT_STRUCTURED_SCAN_BYTES))
+        self.head = []
+        self.size = 0
+        self.seen_marker = False
+        self.record = None
+
+    @property
+    def done(self):
+        return self.record is not None or self.size >= self.limit
+
+    def feed(self, chunks):
+        for chunk in chunks:
+            if not self.done:
+                # O marcador ou o </script> podem vir cortados entre dois blocos
+                window = (self.head[-1][-32:] if self.head else b"") + chunk
+                self.head.append(chunk)
+                self.size += len(chunk)
+                self.seen_marker = self.seen_marker or any(marker in window for marker in _STRUCTURED_MARKERS)
+                if self.seen_marker and b"</script>" in window:
+                    self.record = extract_structured(b"".join(self.head), self.extractors, self.declared_encoding)
+                    if self.record:
+                        return
+            yield chunk
+
+    def finish(self, chunks):
+        """O texto bastou com um marcador já visto: lê só até fechar o <script> (ou o limite)."""
+        if self.seen_marker:
+            for _ in self.feed(chunks):
+                if self.done:
+                    break
+
+
+def _stream_response_text(response, max_chars, max_bytes, io_stats=None, extractors=()):
+    """
+    Lê o corpo em blocos até o limite de bytes, parando quando o texto já basta.
+    Com `extractors`, procura os dados estruturados nos mesmos blocos (ver _StructuredScan).
+    `io_stats` ({"network", "bytes"}) acumula o tempo esperando a rede e os bytes
+    lidos, para separar download de parsing nas métricas.
+    Retorna (texto, registro estruturado ou None).
+    """
+    io_stats = io_stats if io_stats is not None else {"network": 0.0, "bytes": 0}
+
+    def capped_chunks():
+        chunks = response.iter_content(chunk_size=16384)
+        while True:
+            started = time.perf_counter()
+            chunk = next(chunks, None)
+            io_stats["network"] += time.perf_counter() - started
+            if chunk is None:
+                break
+            io_stats["bytes"] += len(chunk)
+            yield chunk
+            if io_stats["bytes"] >= max_bytes:
+                break
+
+    match = re.search(r"charset=([\w\-]+)", response.headers.get("Content-Type", ""))
+    declared = match.group(1) if match else None
+    chunks = capped_chunks()
+    if not extractors:
+        text, _ = text_extractor.stream_html_to_text(chunks, max_chars=max_chars, declared_encoding=declared)
+        return text, None
+    scan = _StructuredScan(extractors, declared)
+    text, _ = text_extractor.stream_html_to_text(scan.feed(chunks), max_chars=max_chars, declared_encoding=declared)
+    if scan.record is None:
+        scan.finish(chunks)
+    if scan.record:
+        return structured_text(scan.record, max_chars), scan.record
+    return text, None
+
+def _read_capped(response, max_bytes, io_stats):
+    """Corpo inteiro até max_bytes (para o pool de parsing), somando o tempo de rede."""
+    chunks = []
+    size = 0
+    iterator = response.iter_content(chunk_size=16384)
+    while size < max_bytes:
+        started = time.perf_counter()
+        chunk = next(iterator, None)
+        io_stats["network"] += time.perf_counter() - started
+        if chunk is None:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+    io_stats["bytes"] += size
+    return b"".join(chunks)[:max_bytes]
+
+# Motivo de descarte ainda não calculado (a etapa de filtro aplica as regras)
+UNCLASSIFIED = object()
+
+# Campos do registro estruturado que os filtros usam (guardados no page_cache)
+FILTER_FIELDS = ("valid_through", "cities", "regions")
+
+def _from_cache(url, cached, classify):
+    """Texto do page_cache; com os campos estruturados guardados, o motivo sai deles como no download."""
+    if classify and cached.get("record"):
+        return cached["text"], filters.job_drop_reason(url, cached["text"], cached["record"])
+    return cached["text"], UNCLASSIFIED
 
 def extract_job_text(url):
-    """Acessa a URL da vaga e extrai o texto principal."""
+    """Acessa a URL da vaga e extrai o texto principal (com cache em disco)."""
+    return _extract(url)[0]
+
+def _extract(url, classify=False):
+    """
+    extract_job_text que devolve (texto, motivo do descarte). Boards do
+    STRUCTURED_EXTRACTORS tentam antes o JSON-LD/estado embutido. Com classify=True,
+    o motivo já vem calculado quando houve registro estruturado ou o pool de parsing
+    rodou os filtros no processo filho; senão vem UNCLASSIFIED.
+    """
+    cached = page_cache.lookup(url)
+    if cached and cached["fresh"]:
+        return _from_cache(url, cached, classify)
+
+    # Modo "stream" (padrão): download com teto de bytes e parser incremental que
+    # para nos primeiros EXTRACT_MAX_CHARS caracteres úteis. "full": BeautifulSoup no documento inteiro
+    streaming = os.getenv("EXTRACT_MODE", "stream") == "stream"
+    max_chars = int(os.getenv("EXTRACT_MAX_CHARS", DEFAULT_EXTRACT_MAX_CHARS))
+    max_bytes = int(os.getenv("EXTRACT_MAX_BYTES", DEFAULT_EXTRACT_MAX_BYTES))
+    # Com PARSE_WORKERS o corpo é baixado inteiro (até o teto) e o parsing sai do GIL
+    pooled = parse_pool.enabled()
+    extractors = structured_extractors(url)
+    record = None
+    io_stats = {"network": 0.0, "bytes": 0}
+    parse_seconds = 0.0
+    reason = UNCLASSIFIED
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove scripts e styles
-        for script in soup(["script", "style", "noscript"]):
-            script.extract()
-            
-        text = soup.get_text(separator=' ', strip=True)
-        return text
+        # Sessão compartilhada: reaproveita conexões keep-alive por host
+        started = time.perf_counter()
+        response = http_client.get(url, headers=page_cache.conditional_headers(cached), stream=streaming or pooled)
+        io_stats["network"] += time.perf_counter() - started
+        try:
+            if response.status_code == 304 and cached:
+                # Página não mudou desde a última visita: reaproveita o texto salvo
+                page_cache.mark_revalidated(url)
+                return _from_cache(url, cached, classify)
+            response.raise_for_status()
+
+            match = re.search(r"charset=([\w\-]+)", response.headers.get("Content-Type", ""))
+            declared = match.group(1) if match else None
+            if pooled:
+                content = _read_capped(response, max_bytes, io_stats)
+                started = time.perf_counter()
+                record = extract_structured(content, extractors, declared)
+                if record is None:
+                    text, pool_reason, where = parse_pool.parse(
+                        content, url, max_chars, declared, full=not streaming, classify=classify,
+                    )
+                    metrics.inc("jobhunter_parse_total", where=where)
+                    if classify:
+                        reason = pool_reason
+                parse_seconds = time.perf_counter() - started
+            elif streaming:
+                started = time.perf_counter()
+                text, record = _stream_response_text(
+                    response, max_chars=max_chars, max_bytes=max_bytes, io_stats=io_stats, extractors=extractors
+                )
+                # Download e parsing se alternam no stream: o parsing é o que sobra
+                parse_seconds = time.perf_counter() - started - io_stats["network"]
+            else:
+                started = time.perf_counter()
+                content = response.content
+                io_stats["network"] += time.perf_counter() - started
+                io_stats["bytes"] = len(content)
+                started = time.perf_counter()
+                record = extract_structured(content, extractors, declared)
+                if record is None:
+                    text = text_extractor.html_to_text(content)
+                parse_seconds = time.perf_counter() - started
+
+            if record is not None:
+                # Campos exatos do JSON-LD: o filtro usa a cidade e a validade direto do registro
+                if pooled or not streaming:
+                    text = structured_text(record, max_chars)
+                metrics.inc("jobhunter_parse_total", where="structured")
+                if classify:
+                    reason = filters.job_drop_reason(url, text, record)
+        finally:
+            # Se o stream parou no meio, fecha a conexão em vez de ler o resto
+            response.close()
+            metrics.observe("jobhunter_stage_seconds", io_stats["network"], stage="fetch")
+            metrics.observe("jobhunter_fetch_seconds", io_stats["network"], domain=domain_of(url))
+            metrics.inc("jobhunter_bytes_downloaded_total", io_stats["bytes"])
+            if parse_seconds:
+                metrics.observe("jobhunter_stage_seconds", max(parse_seconds, 0.0), stage="parse")
+
+        fields = {name: record[name] for name in FILTER_FIELDS} if record else None
+        page_cache.store(url, text, response.headers.get("ETag"), response.headers.get("Last-Modified"), fields)
+        return text, reason
     except Exception as e:
         print(f"Erro ao extrair texto da URL {url}: {e}")
-        return ""
+        return "", UNCLASSIFIED
+
+def is_relevant_job_text(url, text):
+    """Aplica os filtros de texto da vaga (cidade, falsos positivos, gov.br)."""
+    return filters.job_drop_reason(url, text) is None
 
-def get_job_opportunities():
-    """Busca vagas usando os dorks configurados."""
+def _cache_hits_since(baseline):
+    return search_cache.stats()["hits"] + page_cache.stats()["hits"] - baseline
+
+
+def _record_page(page, status, reason=None, score=None, cache_baseline=0):
+    """Registra o resultado final da URL: métricas, índice e progresso (/events)."""
+    metrics.inc("jobhunter_pages_total", status=status)
+    if reason:
+        metrics.inc("jobhunter_dropped_total", kind="job", reason=reason)
+    job_index.record(page["url"], page["text"], status, reason, score)
+    progress.page_done(page["url"], status, _cache_hits_since(cache_baseline))
+
+
+def _search_stage(p, queries, labels, outbox, state, cache_baseline):
+    """Etapa 1: dorks no DuckDuckGo, no ritmo do limitador; só URLs novas seguem adiante."""
+    # Vagas ocultadas no painel não são baixadas nem filtradas de novo
+    discarded = user_state.urls(user_state.DISCARDED)
+    seen_urls = state["seen_urls"]
+    for index, dork in enumerate(queries, 1):
+        p.check()
+        progress.dork(index, len(queries), labels[index - 1], _cache_hits_since(cache_baseline))
+        print(f"[*] Buscando com a dork: {dork}")
+        urls = duckduckgo_search_jobs(dork, num_results=10)
+
+        for url in urls:
+            # Pula se for um site banido ou arquivo PDF
+            if filters.is_banned_job_url(url):
+                metrics.inc("jobhunter_dropped_total", kind="job", reason="banned_domain")
+                continue
+
+            # Dorks parecidas ("RH" x "Recursos Humanos") devolvem as mesmas URLs
+            if url in seen_urls:
+                state["duplicates"] += 1
+                continue
+            seen_urls.add(url)
+            page = {"seq": len(seen_urls), "url": url, "text": ""}
+
+            if url in discarded:
+                state["discarded"] += 1
+                metrics.inc("jobhunter_dropped_total", kind="job", reason="user_discarded")
+                continue
+
+            # Já verificada recentemente: reaproveita o resultado do índice
+            indexed = job_index.lookup_fresh(url)
+            if indexed is not None:
+                state["fresh"] += 1
+                p.put(outbox, dict(page, indexed=indexed))
+                continue
+
+            print(f"[*] Extraindo dados de: {url}")
+            progress.page_submitted()
+            state["fetched"] += 1
+            p.put(outbox, page)
+    p.close(outbox)
+
+
+def _fetch_stage(p, inbox, outbox):
+    """
+    Etapa 2: download + extração do texto no PageFetcher (limite por domínio).
+    No modo stream as duas coisas são intercaladas (o parser para no orçamento
+    de caracteres), então ficam na mesma etapa. Com o pool de parsing (PARSE_WORKERS)
+    os filtros já voltam calculados do processo filho. No máximo `queue_size` páginas em voo.
+    """
+    in_flight = threading.BoundedSemaphore(p.queue_size)
+    futures = []
+
+    def deliver(page, future):
+        in_flight.release()
+        page["text"], page["reason"] = future.result() if future.exception() is None else ("", UNCLASSIFIED)
+        try:
+            p.put(outbox, page)
+        except pipeline.Cancelled:
+            pass
+
+    with PageFetcher(functools.partial(_extract, classify=True)) as fetcher:
+        for page in p.drain(inbox):
+            if "indexed" in page:
+                p.put(outbox, page)
+                continue
+            in_flight.acquire()
+            future = fetcher.submit(page["url"])
+            future.add_done_callback(functools.partial(deliver, page))
+            futures.append(future)
+        # O executor do PageFetcher não aceita tarefas depois de fechado: espera a fila por domínio esvaziar
+        wait(futures)
+    p.close(outbox)
+
+
+def _filter_stage(p, inbox, outbox, evaluate, cache_baseline):
+    """
+    Etapa 3: regras de texto; as aceitas seguem (para a IA, se ligada) e o resto é registrado aqui.
+    Com a IA ligada, quase duplicatas de uma vaga já aceita nesta busca seguem marcadas
+    com "duplicate_of" (MinHash/LSH, ver src/dedup.py): só o representante vai ao Gemini.
+    """
+    near_duplicates = dedup.NearDuplicateIndex() if evaluate and os.getenv("DEDUP_ENABLED", "1") != "0" else None
+    for page in p.drain(inbox):
+        indexed = page.get("indexed")
+        if indexed is not None:
+            if indexed["status"] == job_index.ACCEPTED:
+                p.put(outbox, dict(page, text=indexed["text"]))
+            continue
+
+        text, reason = page["text"], page.pop("reason", UNCLASSIFIED)
+        if reason is UNCLASSIFIED:
+            with metrics.timer("filter"):
+                reason = filters.job_drop_reason(page["url"], text)
+        if not text:
+            _record_page(page, job_index.ERROR, reason, cache_baseline=cache_baseline)
+        elif reason:
+            _record_page(page, job_index.DROPPED, reason, cache_baseline=cache_baseline)
+        else:
+            page["text"] = text[:4000]
+            if not evaluate:
+                _record_page(page, job_index.ACCEPTED, cache_baseline=cache_baseline)
+            elif near_duplicates is not None:
+                sig = dedup.signature(page["text"])
+                match = near_duplicates.query(sig) if sig else None
+                if match is not None and match != page["url"]:
+                    page["duplicate_of"] = match
+                elif sig:
+                    near_duplicates.add(page["url"], sig)
+            p.put(outbox, page)
+    p.close(outbox)
+
+
+def _ai_stage(p, inbox, outbox, state, cache_baseline):
+    """
+    Etapa 4 (opcional): avaliação em lote pelo Gemini; a nota vai para o índice (score).
+    Quase duplicatas (marcadas no filtro) não vão ao Gemini: herdam o veredito do
+    representante, que sempre chega antes pela fila.
+    """
+    # O SDK do Gemini só é carregado quando a avaliação está ligada
+    from src import ai_agent
+
+    size = int(os.getenv("GEMINI_BATCH_SIZE", ai_agent.DEFAULT_BATCH_SIZE))
+    batch = []
+    decided = {}       # URL do representante -> veredito
+    waiting = {}       # URL do representante ainda no lote -> duplicatas
+
+    def finish(page, verdict):
+        if verdict is None:
+            state["ai_discarded"] += 1
+            _record_page(page, job_index.DROPPED, "ai_discarded", cache_baseline=cache_baseline)
+            return
+        if verdict is ai_agent.FAILED:
+            # Sem resposta do Gemini: a vaga segue, sem nota
+            score = None
+        else:
+            page["verdict"] = verdict
+            score = page["score"] = ai_agent.verdict_score(verdict)
+        _record_page(page, job_index.ACCEPTED, score=score, cache_baseline=cache_baseline)
+        p.put(outbox, page)
+
+    def flush():
+        verdicts = ai_agent.evaluate_jobs_batch(batch, batch_size=size)
+        for page, verdict in zip(batch, verdicts):
+            state["ai_evaluated"] += 1
+            decided[page["url"]] = verdict
+            finish(page, verdict)
+            for duplicate in waiting.pop(page["url"], ()):
+                finish(duplicate, verdict)
+        batch.clear()
+
+    for page in p.drain(inbox):
+        if "indexed" in page:
+            p.put(outbox, page)
+            continue
+        representative = page.pop("duplicate_of", None)
+        if representative is not None:
+            state["ai_duplicates_skipped"] += 1
+            if representative in decided:
+                finish(page, decided[representative])
+            else:
+                waiting.setdefault(representative, []).append(page)
+            continue
+        batch.append(page)
+        if len(batch) >= size:
+            flush()
+    if batch:
+        flush()
+    p.close(outbox)
+
+
+def _job_pages(part, parts, evaluate):
+    """Páginas aceitas (dicts com seq, url, text e o veredito da IA), na ordem em que terminam."""
     
     base_queries = [
         # Dorks originais refinados
@@ -75,68 +641,112 @@ def get_job_opportunities():
     # Exclusões para evitar vagas de outros estados, cargos irrelevantes e falsos positivos
     exclusions = '-Camaçari -Campinas -Bahia -SP -RJ -MG -PR -SC -RS -PE -Pernambuco -Recife -CE -Fortaleza -site:ingles.com -site:inglês.com -site:cambridge.org -site:spanishdict.com -site:glosbe.com -dictionary -dicionario -headlight -farol -carro -peças -automotivo -automotive -site:.cl "naturales" "recursos naturais" -renda -ganhar -dinheiro -online -extra -afiliado -turismo -viagem -hotel -pousada -restaurante -instrutor -professor -idiomas -wizard'
     
+    if part is not None and parts > 1:
+        base_queries = base_queries[part::parts]
     queries = [f"{q} {exclusions}" for q in base_queries]
     
-    jobs_data = []
-    
-    # Lista de domínios proibidos (filtro extra no Python)
-    banned_domains = [
-        'ingles.com', 'dicionario', 'dictionary', 'translation', 'cambridge.org', 
-        'significado', 'tradutor', 'spanishdict.com', 'glosbe.com',
-        'chevyavalanchefanclub.com', 'forum', 'clubedo', 'mecanica', 'autopecas',
-        'wikipedia.org', 'pt.wikipedia.org', 'en.wikipedia.org', '.pdf', 'millaray-temuco.cl',
-        'tiktok.com', 'facebook.com', 'instagram.com', 'twitter.com', 'x.com',
-        'mobills.com.br', 'meupaitrabalha', 'vagas.com.br/blog', 'gupy.io/blog', 'gupy.io/blog-do-emprego',
-        'blog.gupy.io', 'vagas.com.br/educacao', 'melhoresdestinos.com.br', 'tripadvisor', 'trivago',
-        'bahiaeconomica.com.br', 'alagoinhas', 'feiradesantana', 'mundoconectado.com.br', 'canaltech', 'tecmundo',
-        'rioempregos.com.br', 'vagasrj', 'vagasmg', 'vagaspe', 'vagasce', 'rh.com' # Bloqueando Restoration Hardware (falso positivo de RH)
-    ]
+    if evaluate is None:
+        evaluate = os.getenv("AI_SCORING", "0") == "1" and bool(os.getenv("GEMINI_API_KEY"))
 
-    for dork in queries:
-        print(f"[*] Buscando com a dork: {dork}")
-        urls = duckduckgo_search_jobs(dork, num_results=10)
-        
-        for url in urls:
-            # Pula se for um site banido ou arquivo PDF
-            if any(b in url.lower() for b in banned_domains) or url.lower().endswith('.pdf'):
-                continue
-                
-            print(f"[*] Extraindo dados de: {url}")
-            text = extract_job_text(url)
-            # Filtro extra no texto para garantir que "RH" é Recursos Humanos e não "Right Hand" ou "Recursos Naturais"
-            if text:
-                lower_text = text.lower()
-                
-                # Validação de Cidade (Manaus deve ser a estrela, não Camaçari/Bahia)
-                forbidden_cities = ['camaçari', 'alagoinhas', 'salvador', 'recife', 'fortaleza', 'rio de janeiro', 'são paulo', 'curitiba']
-                if any(city in lower_text for city in forbidden_cities):
-                    # Se tiver Manaus E uma cidade proibida, verificamos se Manaus parece ser apenas menção secundária
-                    if 'manaus' not in lower_text:
-                        continue
-                    # Se Camaçari aparecer mais que Manaus, provavelmente é de lá
-                    if lower_text.count('camaçari') > lower_text.count('manaus'):
-                        continue
-
-                # Descartar se falar de recursos naturais ou guias escolares
-                if any(term in lower_text for term in ['naturales', 'recursos naturais', 'guia de estudo', 'clase', 'educación']):
-                    if not any(term in lower_text for term in ['vaga', 'contrata', 'currículo', 'analista']):
-                        continue
-
-                # Validação especial para sites governamentais (apenas se for vaga/concurso/seleção)
-                if 'gov.br' in url.lower():
-                    if not any(term in lower_text for term in ['vaga', 'concurso', 'processo seletivo', 'contratação', 'emprego', 'rh', 'recursos humanos']):
-                        continue
-
-                jobs_data.append({
-                    "url": url,
-                    "text": text[:4000]
-                })
-        time.sleep(4) # Pausa estratégica para evitar bloqueios do DuckDuckGo
-                
+    # busca -> download/extração -> filtro -> IA (opcional), cada etapa na sua
+    # thread e ligada à próxima por uma fila limitada (ver src/pipeline.py)
+    state = {"seen_urls": set(), "duplicates": 0, "fresh": 0, "discarded": 0, "fetched": 0,
+             "ai_evaluated": 0, "ai_discarded": 0, "ai_duplicates_skipped": 0}
+    cache_hits_before = search_cache.stats()["hits"]
+    cache_baseline = cache_hits_before + page_cache.stats()["hits"]
+    p = pipeline.Pipeline()
+    urls_q, pages_q, accepted_q = p.queue(), p.queue(), p.queue()
+    p.stage("search", _search_stage, p, queries, base_queries, urls_q, state, cache_baseline)
+    p.stage("fetch", _fetch_stage, p, urls_q, pages_q)
+    p.stage("filter", _filter_stage, p, pages_q, accepted_q, evaluate, cache_baseline)
+    results_q = accepted_q
+    if evaluate:
+        results_q = p.queue()
+        p.stage("ai", _ai_stage, p, accepted_q, results_q, state, cache_baseline)
+
+    accepted = 0
+    for page in p.results(results_q):
+        accepted += 1
+        yield page
+
+    duplicates, skipped_fresh, skipped_discarded = state["duplicates"], state["fresh"], state["discarded"]
+    cached_searches = search_cache.stats()["hits"] - cache_hits_before
+    LAST_RUN_STATS.clear()
+    LAST_RUN_STATS.update({
+        "dorks": len(queries),
+        "searches_from_cache": cached_searches,
+        "unique_urls": len(state["seen_urls"]),
+        "duplicate_fetches_saved": duplicates,
+        "index_fresh_skipped": skipped_fresh,
+        "discarded_skipped": skipped_discarded,
+        "pages_fetched": state["fetched"],
+        "jobs": accepted,
+    })
+    if evaluate:
+        LAST_RUN_STATS.update(ai_evaluated=state["ai_evaluated"], ai_discarded=state["ai_discarded"],
+                              ai_duplicates_skipped=state["ai_duplicates_skipped"])
+    print(f"[*] Economia: {duplicates} downloads repetidos evitados, {skipped_fresh} URLs já verificadas no índice, {skipped_discarded} ocultadas pelo usuário e {cached_searches}/{len(queries)} buscas reaproveitadas do cache")
+
+
+def _job_record(page, spill):
+    return records.JobRecord(page["url"], page["text"], page.get("verdict"), page.get("score"), spill=spill)
+
+
+def iter_job_opportunities(part=None, parts=1, evaluate=None):
+    """
+    Como get_job_opportunities, mas entrega cada vaga (JobRecord) assim que é
+    aceita, na ordem em que as páginas terminam e sem agrupar quase duplicatas:
+    a memória não cresce com o número de vagas. Parar o consumo antes do fim
+    cancela a busca (e LAST_RUN_STATS não é atualizado).
+    """
+    spill = records.text_spill()
+    for page in _job_pages(part, parts, evaluate):
+        yield _job_record(page, spill)
+
+
+def get_job_opportunities(part=None, parts=1, evaluate=None):
+    """
+    Busca vagas usando os dorks configurados. Com `parts` > 1 só roda a fatia
+    `part` (0..parts-1) das dorks, para o agendador espalhar a busca em horários.
+    Com `evaluate` (padrão: AI_SCORING do .env) as vagas aceitas passam pelo Gemini.
+    Retorna JobRecords na ordem das dorks, com as quase duplicatas agrupadas.
+    """
+    spill = records.text_spill()
+    # As páginas terminam fora de ordem; o resultado segue a ordem das dorks
+    pages = sorted(((page["seq"], _job_record(page, spill)) for page in _job_pages(part, parts, evaluate)),
+                   key=operator.itemgetter(0))
+    jobs_data = [job for _, job in pages]
+
+    # A mesma vaga publicada em vários boards vira um único card (com links alternativos)
+    filtered_count = len(jobs_data)
+    if os.getenv("DEDUP_ENABLED", "1") != "0":
+        jobs_data = dedup.cluster_jobs(jobs_data)
+    LAST_RUN_STATS.update(near_duplicates=filtered_count - len(jobs_data), jobs=len(jobs_data))
     return jobs_data
 
+def get_indexed_jobs(keep_text=False):
+    """
+    Vagas aceitas do índice persistente (buscas recentes), agrupadas para o painel.
+    O índice é lido em lotes e, sem keep_text, os registros ficam sem o texto
+    (o painel só usa a URL): a memória acompanha o número de cards, não o de textos.
+    """
+    discarded = user_state.urls(user_state.DISCARDED)
+    spill = records.text_spill() if keep_text else None
+    jobs = (records.job_record(job, spill) for job in job_index.iter_dashboard_jobs() if job["url"] not in discarded)
+    if os.getenv("DEDUP_ENABLED", "1") != "0":
+        jobs = dedup.cluster_jobs(jobs, keep_text=keep_text)
+    else:
+        jobs = [job if keep_text else job.replace(text="") for job in jobs]
+    # O modo preguiçoso (/api/jobs) lê o agrupamento do índice
+    job_index.set_clusters(jobs)
+    return jobs
+
 def get_business_leads():
     """Busca notícias sobre expansões e novas empresas em Manaus."""
+    return list(iter_business_leads())
+
+def iter_business_leads():
+    """Como get_business_leads, mas entrega cada lead assim que passa nos filtros."""
     # Adicionamos as mesmas exclusões para os leads
     exclusions = '-headlight -farol -carro -peças -automotivo -automotive -forum -site:.cl "naturales" "recursos naturais" -renda -ganhar -dinheiro -online -turismo -viagem -PE -Recife -CE -Fortaleza -RJ -rioempregos'
     
@@ -148,39 +758,33 @@ def get_business_leads():
         f'"contratação" Manaus "Recursos Humanos" empresa novas {exclusions}' # Trocamos RH por "Recursos Humanos" aqui para ser mais preciso
     ]
     
-    leads = []
     seen_urls = set()
-    banned_domains = ['forum', 'clubedo', 'mecanica', 'chevyavalanchefanclub.com', 'wikipedia.org', 'millaray-temuco.cl', 'tiktok.com', 'facebook.com', 'instagram.com', 'mobills.com.br', 'gupy.io/blog', 'vagas.com.br/blog', 'melhoresdestinos.com.br', 'tripadvisor', 'bahiaeconomica.com.br', 'mundoconectado.com.br', 'rioempregos.com.br', 'rh.com']
     
     for q in queries:
         print(f"[*] Buscando leads de negócios: {q}")
         urls = duckduckgo_search_jobs(q, num_results=5)
         for url in urls:
             if url not in seen_urls:
-                if any(b in url.lower() for b in banned_domains):
+                # Marca já na primeira vez para não baixar de novo uma URL rejeitada
+                seen_urls.add(url)
+                if filters.is_banned_lead_url(url):
+                    metrics.inc("jobhunter_dropped_total", kind="lead", reason="banned_domain")
                     continue
 
                 # Extraímos apenas o título/texto básico para o card
                 text = extract_job_text(url)
-                if text:
-                    lower_text = text.lower()
-                    # Filtro para sites governamentais (apenas se for relevante para emprego/negócios)
-                    if 'gov.br' in url.lower():
-                        if not any(term in lower_text for term in ['vaga', 'concurso', 'contratação', 'emprego', 'rh', 'recursos humanos', 'investimento', 'fábrica', 'empresa']):
-                            continue
-
-                    # Filtro de conteúdo mínimo
-                    if len(text) < 500: continue
-                    
-                    leads.append({
+                with metrics.timer("filter"):
+                    reason = filters.lead_drop_reason(url, text)
+                if reason:
+                    metrics.inc("jobhunter_dropped_total", kind="lead", reason=reason)
+                else:
+                    lead = {
                         "url": url,
                         "title": text[:100].strip() + "...",
                         "snippet": text[:300].strip() + "..."
-                    })
-                    seen_urls.add(url)
-        time.sleep(2)
-        
-    return leads
+                    }
+                    job_index.record_lead(url, lead["title"], lead["snippet"])
+                    yield lead
 
 if __name__ == "__main__":
     # Teste requer as variaveis de ambiente setadas
@@ -0,0 +1,33 @@
+import hashlib
+import os
+import re
+import sqlite3
+
+# Diretório dos arquivos persistentes (caches, índices). Configurável via .env
+DEFAULT_DATA_DIR = "data"
+
+
+def data_path(filename):
+    """Caminho de um arquivo dentro do DATA_DIR (cria o diretório se preciso)."""
+    data_dir = os.getenv("DATA_DIR", DEFAULT_DATA_DIR)
+    os.makedirs(data_dir, exist_ok=True)
+    return os.path.join(data_dir, filename)
+
+
+def connect(filename):
+    """
+    Abre um banco SQLite do DATA_DIR pronto para uso entre threads.
+    Quem compartilhar a conexão deve serializar o acesso com um Lock próprio.
+    """
+    conn = sqlite3.connect(data_path(filename), timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    # WAL permite leitura do painel enquanto a busca escreve
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def content_hash(text):
+    """Hash do texto normalizado (minúsculas, espaços colapsados)."""
+    normalized = re.sub(r"\s+", " ", (text or "").lower()).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
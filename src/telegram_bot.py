@@ -1,5 +1,6 @@
 import os
-import requests
+
+from src import http_client
 
 def send_telegram_message(message):
     """
@@ -28,7 +29,7 @@ def send_telegram_message(message):
     
     print(f"[Telegram] Enviando mensagem para chat_id {chat_id}...")
     try:
-        response = requests.post(url, json=payload, timeout=10)
+        response = http_client.post(url, json=payload, limiter="telegram")
 
         print(f"[Telegram] Status: {response.status_code}, Resposta: {response.text}")
         response.raise_for_status()
@@ -62,6 +63,6 @@ def send_jobs_report(avaliacoes):
                 "chat_id": os.getenv("TELEGRAM_CHAT_ID"),
                 "text": av, # Sem parse_mode
             }
-            requests.post(f"https://api.telegram.org/bot{os.getenv('TELEGRAM_TOKEN')}/sendMessage", json=payload)
+            http_client.post(f"https://api.telegram.org/bot{os.getenv('TELEGRAM_TOKEN')}/sendMessage", json=payload, limiter="telegram")
     
     print("Relatório enviado com sucesso via Telegram!")
@@ -0,0 +1,125 @@
+import codecs
+import re
+from html.parser import HTMLParser
+
+# Tags cujo conteúdo nunca entra no texto da vaga
+SKIP_TAGS = ("script", "style", "noscript")
+
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([A-Za-z0-9_\-]+)', re.IGNORECASE)
+
+
+def html_to_text(content):
+    """Caminho completo: monta a árvore inteira com BeautifulSoup e achata o documento."""
+    # Só o modo "full" usa o bs4; o caminho em stream não paga o import
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, 'html.parser')
+
+    # Remove scripts e styles
+    for script in soup(list(SKIP_TAGS)):
+        script.extract()
+
+    return soup.get_text(separator=' ', strip=True)
+
+
+class _TextCollector(HTMLParser):
+    """Parser incremental que junta os trechos de texto visíveis até bater o orçamento."""
+
+    def __init__(self, max_chars):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.parts = []
+        self.size = 0
+        self.skip_depth = 0
+        self.done = False
+        # Um mesmo trecho pode chegar picado entre dois blocos do download;
+        # só vira "parte" quando aparece a próxima tag
+        self._pending = []
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag in SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_data(self, data):
+        if not self.skip_depth and not self.done:
+            self._pending.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        data = "".join(self._pending).strip()
+        self._pending = []
+        if not data or self.done:
+            return
+        self.parts.append(data)
+        # +1 pelo espaço separador, igual ao get_text(separator=' ')
+        self.size += len(data) + 1
+        if self.max_chars and self.size >= self.max_chars:
+            self.done = True
+
+
+def sniff_encoding(first_chunk, declared=None):
+    """Encoding do charset do Content-Type, da <meta charset> ou UTF-8."""
+    if declared:
+        return declared
+    match = _META_CHARSET.search(first_chunk[:4096])
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode("ascii")).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+def stream_html_to_text(chunks, max_chars=4000, declared_encoding=None):
+    """
+    Caminho incremental: decodifica e alimenta o HTMLParser bloco a bloco e
+    para assim que juntar `max_chars` caracteres úteis (0 = sem limite).
+    `chunks` é qualquer iterável de bytes (ex.: response.iter_content).
+    Retorna (texto, terminou_antes_do_fim).
+    """
+    parser = _TextCollector(max_chars)
+    decoder = None
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder(sniff_encoding(chunk, declared_encoding))(errors="replace")
+        parser.feed(decoder.decode(chunk))
+        if parser.done:
+            break
+    else:
+        if decoder is not None:
+            parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+
+    text = " ".join(parser.parts)
+    if max_chars:
+        text = text[:max_chars]
+    return text, parser.done
+
+
+def bytes_to_text(content, max_chars=4000, declared_encoding=None, full=False, chunk_size=16384):
+    """
+    Texto de um corpo já baixado: BeautifulSoup no documento inteiro (full) ou o
+    parser incremental em blocos, parando no orçamento como no download em stream.
+    """
+    if full:
+        text = html_to_text(content)
+        return text[:max_chars] if max_chars else text
+    chunks = (content[i:i + chunk_size] for i in range(0, len(content), chunk_size))
+    text, _ = stream_html_to_text(chunks, max_chars=max_chars, declared_encoding=declared_encoding)
+    return text
@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+
+from src import storage
+
+# Estado do usuário no servidor: vagas seguidas, ocultadas e já vistas no painel.
+# Antes vivia só no localStorage do navegador; aqui a busca também enxerga as
+# ocultadas (nem baixa de novo) e o conjunto de vistas tem limite de tamanho/idade.
+TRACKED = "tracked"
+DISCARDED = "discarded"
+SEEN = "seen"
+KINDS = (TRACKED, DISCARDED, SEEN)
+
+DEFAULT_SEEN_MAX_DAYS = 30
+DEFAULT_SEEN_MAX = 5000
+
+_conn = None
+_lock = threading.Lock()
+
+
+def _db():
+    global _conn
+    if _conn is None:
+        _conn = storage.connect(os.getenv("USER_STATE_FILE", "user_state.sqlite3"))
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS url_state (
+                kind TEXT NOT NULL,
+                url TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (kind, url)
+            )
+        """)
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_url_state_kind_time ON url_state(kind, updated_at)")
+        _conn.commit()
+    return _conn
+
+
+def _check_kind(kind):
+    if kind not in KINDS:
+        raise ValueError(f"estado desconhecido: {kind!r} (use {', '.join(KINDS)})")
+
+
+def set_state(kind, urls, value=True):
+    """Marca (value=True) ou desmarca as URLs no estado `kind`."""
+    _check_kind(kind)
+    urls = [u for u in urls if u]
+    if not urls:
+        return
+    now = time.time()
+    with _lock:
+        if value:
+            _db().executemany(
+                "INSERT INTO url_state (kind, url, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(kind, url) DO UPDATE SET updated_at = excluded.updated_at",
+                [(kind, url, now) for url in urls],
+            )
+        else:
+            _db().executemany("DELETE FROM url_state WHERE kind = ? AND url = ?", [(kind, url) for url in urls])
+        if kind == SEEN:
+            _prune_seen_locked(now)
+        _db().commit()
+
+
+def urls(kind):
+    """Conjunto das URLs no estado `kind` (consulta O(1) por URL)."""
+    _check_kind(kind)
+    with _lock:
+        rows = _db().execute("SELECT url FROM url_state WHERE kind = ?", (kind,)).fetchall()
+    return {row["url"] for row in rows}
+
+
+def snapshot():
+    """Os três estados como listas, para o painel carregar de uma vez."""
+    with _lock:
+        rows = _db().execute("SELECT kind, url FROM url_state ORDER BY updated_at").fetchall()
+    result = {kind: [] for kind in KINDS}
+    for row in rows:
+        result[row["kind"]].append(row["url"])
+    return result
+
+
+def _prune_seen_locked(now):
+    """Vistas expiram após USER_STATE_SEEN_MAX_DAYS e ficam limitadas às USER_STATE_SEEN_MAX mais recentes."""
+    max_age = float(os.getenv("USER_STATE_SEEN_MAX_DAYS", DEFAULT_SEEN_MAX_DAYS)) * 86400
+    max_count = int(os.getenv("USER_STATE_SEEN_MAX", DEFAULT_SEEN_MAX))
+    _db().execute("DELETE FROM url_state WHERE kind = ? AND updated_at < ?", (SEEN, now - max_age))
+    _db().execute("""
+        DELETE FROM url_state WHERE kind = ? AND url NOT IN (
+            SELECT url FROM url_state WHERE kind = ? ORDER BY updated_at DESC LIMIT ?
+        )
+    """, (SEEN, SEEN, max_count))
+
+
+def stats():
+    with _lock:
+        rows = _db().execute("SELECT kind, COUNT(*) FROM url_state GROUP BY kind").fetchall()
+    return {row[0]: row[1] for row in rows}
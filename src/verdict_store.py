@@ -0,0 +1,140 @@
+import hashlib
+import os
+import threading
+import time
+
+from src import storage
+
+# Memória persistente dos vereditos do Gemini, chaveada pelo hash do texto
+# normalizado da vaga + versão do prompt. A mesma vaga só volta para a IA
+# quando o texto muda ou quando as regras do prompt são editadas.
+DEFAULT_MAX_AGE_DAYS = 30   # vereditos não vistos há mais tempo são descartados
+EVICT_EVERY = 50
+
+_conn = None
+_lock = threading.Lock()
+_writes = 0
+_stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+
+def _db():
+    global _conn
+    if _conn is None:
+        _conn = storage.connect(os.getenv("VERDICT_STORE_FILE", "verdicts.sqlite3"))
+        _conn.execute("""
+            CREATE TABLE IF NOT EXISTS verdicts (
+                content_hash TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                url TEXT,
+                verdict TEXT,
+                created_at REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                PRIMARY KEY (content_hash, prompt_version)
+            )
+        """)
+        _conn.execute("CREATE INDEX IF NOT EXISTS idx_verdicts_last_seen ON verdicts(last_seen)")
+        _conn.commit()
+    return _conn
+
+
+content_hash = storage.content_hash
+
+
+def prompt_version(*parts):
+    """
+    Versão do prompt: hash dos textos que definem a avaliação (perfil, regras,
+    formato, modelo). PROMPT_VERSION no .env força uma versão manual.
+    """
+    manual = os.getenv("PROMPT_VERSION")
+    if manual:
+        return manual
+    return hashlib.sha1("\x00".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+def enabled():
+    return os.getenv("VERDICT_STORE_ENABLED", "1") != "0"
+
+
+def lookup(text, version, url=None):
+    """
+    Retorna (encontrado, veredito). Veredito None = vaga descartada pela IA.
+    Se a mesma vaga aparecer em outra URL, o link do veredito é trocado pelo novo.
+    """
+    if not enabled():
+        return False, None
+    key = content_hash(text)
+    with _lock:
+        row = _db().execute(
+            "SELECT url, verdict FROM verdicts WHERE content_hash = ? AND prompt_version = ?",
+            (key, version),
+        ).fetchone()
+        if row is None:
+            _stats["misses"] += 1
+            return False, None
+        _db().execute(
+            "UPDATE verdicts SET last_seen = ? WHERE content_hash = ? AND prompt_version = ?",
+            (time.time(), key, version),
+        )
+        _db().commit()
+        _stats["hits"] += 1
+    verdict = row["verdict"]
+    if verdict and url and row["url"] and row["url"] != url:
+        verdict = verdict.replace(row["url"], url)
+    return True, verdict
+
+
+def store(text, version, url, verdict):
+    """Grava o veredito (None = descartada). Falhas de consulta não devem ser gravadas."""
+    global _writes
+    if not enabled():
+        return
+    now = time.time()
+    with _lock:
+        _db().execute(
+            "INSERT OR REPLACE INTO verdicts (content_hash, prompt_version, url, verdict, created_at, last_seen) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (content_hash(text), version, url, verdict, now, now),
+        )
+        _db().commit()
+        _stats["stored"] += 1
+        _writes += 1
+        if _writes % EVICT_EVERY == 1:
+            _evict_locked(version, now)
+
+
+def evict(version):
+    """Remove vereditos de outras versões do prompt e os não vistos há N dias."""
+    if not enabled():
+        return
+    with _lock:
+        _evict_locked(version, time.time())
+
+
+def _evict_locked(version, now):
+    max_age = float(os.getenv("VERDICT_STORE_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS)) * 86400
+    cur = _db().execute(
+        "DELETE FROM verdicts WHERE prompt_version != ? OR last_seen < ?", (version, now - max_age)
+    )
+    _db().commit()
+    _stats["evicted"] += cur.rowcount
+
+
+def invalidate():
+    """Apaga todos os vereditos (ex.: depois de mudar o perfil sem alterar o texto do prompt)."""
+    with _lock:
+        _db().execute("DELETE FROM verdicts")
+        _db().commit()
+
+
+def stats():
+    return dict(_stats, enabled=enabled())
+
+
+if __name__ == "__main__":
+    # Uso: python -m src.verdict_store --invalidate
+    import sys
+    from dotenv import load_dotenv
+    load_dotenv()
+    if "--invalidate" in sys.argv:
+        invalidate()
+        print("[*] Vereditos da IA apagados; as próximas vagas serão reavaliadas.")